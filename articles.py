@@ -0,0 +1,211 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+import soupsieve
+
+import config
+from metrics import span, count
+from news_archive import url_hash
+
+# بخش‌هایی از صفحه خبر که متن اصلی نیستند
+_BOILERPLATE = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe']
+_SPACES = re.compile(r'\s+')
+_DESCRIPTION = soupsieve.compile('meta[property="og:description"], meta[name="description"]')
+
+
+def _clean(text):
+    return _SPACES.sub(' ', text).strip()
+
+
+def extract_article(html, parser='html.parser', body_selector=None):
+    """متن اصلی و لید یک صفحه خبر
+
+    اگر انتخابگر body منبع تعیین شده باشد از همان استفاده می‌شود؛ وگرنه
+    عنصری که بیشترین متن پاراگراف مستقیم را دارد متن اصلی حساب می‌شود.
+    لید توضیح meta صفحه یا اولین پاراگراف بلند متن است.
+    """
+    soup = BeautifulSoup(html, parser)
+    meta = _DESCRIPTION.select_one(soup)
+    lead = _clean(meta.get('content', '')) if meta else ''
+    for tag in soup(_BOILERPLATE):
+        tag.decompose()
+
+    body = soupsieve.select_one(body_selector, soup) if body_selector else None
+    if body is not None:
+        paragraphs = [_clean(p.get_text(' ')) for p in body.find_all('p')] or [_clean(body.get_text(' '))]
+    else:
+        scores = defaultdict(int)
+        for p in soup.find_all('p'):
+            scores[p.parent] += len(p.get_text(strip=True))
+        if not scores:
+            return {'lead': lead, 'text': ''}
+        best = max(scores, key=scores.get)
+        paragraphs = [_clean(p.get_text(' ')) for p in best.find_all('p', recursive=False)]
+
+    paragraphs = [p for p in paragraphs if p]
+    if not lead:
+        lead = next((p for p in paragraphs if len(p) >= config.ARTICLE_LEAD_MIN_CHARS), '')
+    text = '\n'.join(paragraphs)[:config.ARTICLE_MAX_CHARS]
+    return {'lead': lead[:config.ARTICLE_MAX_CHARS], 'text': text}
+
+
+class ArticleCache:
+    """متن استخراج‌شده خبرها روی دیسک با کلید هش URL یکتا؛ حذف LRU با سقف تعداد و حجم"""
+
+    def __init__(self, path=None, max_entries=None, max_bytes=None):
+        self.path = path or config.ARTICLE_CACHE_FILE
+        self.max_entries = max_entries or config.ARTICLE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.ARTICLE_CACHE_MAX_BYTES
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.entries = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن {self.path}: {e}")
+
+    def get(self, url):
+        with self._lock:
+            entry = self.entries.get(url_hash(url))
+            if entry is None:
+                return None
+            entry['used'] = int(time.time())
+            self.dirty = True
+            return {'lead': entry['lead'], 'text': entry['text']}
+
+    def put(self, url, article):
+        with self._lock:
+            self.entries[url_hash(url)] = {
+                'url': url,
+                'lead': article['lead'],
+                'text': article['text'],
+                'used': int(time.time()),
+            }
+            self.dirty = True
+
+    @staticmethod
+    def _size(entry):
+        return len(entry['lead'].encode('utf-8')) + len(entry['text'].encode('utf-8'))
+
+    def evict(self):
+        """حذف کم‌استفاده‌ترین‌ها تا زیر سقف تعداد و حجم"""
+        with self._lock:
+            total = sum(self._size(e) for e in self.entries.values())
+            if len(self.entries) <= self.max_entries and total <= self.max_bytes:
+                return 0
+            removed = 0
+            for key in sorted(self.entries, key=lambda k: self.entries[k]['used']):
+                if len(self.entries) <= self.max_entries and total <= self.max_bytes:
+                    break
+                total -= self._size(self.entries.pop(key))
+                removed += 1
+            self.dirty = True
+            return removed
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.evict()
+        # دریافت‌های جامانده از مهلت کل ممکن است هم‌زمان put کنند
+        with self._lock:
+            entries = dict(self.entries)
+            self.dirty = False
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {self.path}: {e}")
+
+
+class ArticleFetcher:
+    """دریافت صفحه خبرها با صف محدود: سقف تعداد در هر اجرا، هم‌زمانی کل و هر میزبان، مهلت هر دسته"""
+
+    def __init__(self, fetcher, cache=None, parser='html.parser'):
+        self.fetcher = fetcher
+        self.cache = cache if cache is not None else ArticleCache()
+        self.parser = parser
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(config.ARTICLE_PER_HOST))
+        self._slots_lock = threading.Lock()
+        # سقف هم‌زمانی و تعداد دریافت کل اجرا، مشترک بین منابع
+        self._workers = threading.BoundedSemaphore(config.ARTICLE_WORKERS)
+        self.budget = config.ARTICLE_MAX_PER_RUN
+        self._inflight = {}
+
+    def _slot(self, url):
+        with self._slots_lock:
+            return self._host_slots[urlsplit(url).netloc]
+
+    def _fetch_one(self, url, body_selector):
+        with self._workers, self._slot(url):
+            with span('articles.fetch'):
+                html = self.fetcher.get(url, config.ARTICLE_TIMEOUT, conditional=False)
+        with span('articles.extract'):
+            article = extract_article(html, self.parser, body_selector)
+        self.cache.put(url, article)
+        return article
+
+    def fetch_many(self, items):
+        """متن خبرها؛ items فهرست (url، انتخابگر body) و خروجی url -> متن یا None
+
+        از چند رشته (هر منبع یکی) هم‌زمان صدا زده می‌شود؛ خبری که منبع دیگری
+        در حال دریافت آن است دوباره دریافت نمی‌شود و منتظر همان نتیجه می‌ماند.
+        """
+        results = {}
+        pending = []
+        queued = set()
+        for url, body_selector in items:
+            if url in results or url in queued:
+                continue
+            article = self.cache.get(url)
+            if article is not None:
+                results[url] = article
+                count('articles.cached')
+            else:
+                pending.append((url, body_selector))
+                queued.add(url)
+        if not pending:
+            return results
+
+        hosts = {urlsplit(url).netloc for url, _ in pending}
+        workers = min(config.ARTICLE_WORKERS, config.ARTICLE_PER_HOST * len(hosts))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = {}
+        with self._slots_lock:
+            for url, body_selector in pending:
+                future = self._inflight.get(url)
+                if future is None:
+                    if self.budget <= 0:
+                        # بقیه در اجرای بعد دریافت می‌شوند
+                        results[url] = None
+                        count('articles.deferred')
+                        continue
+                    self.budget -= 1
+                    future = pool.submit(self._fetch_one, url, body_selector)
+                    self._inflight[url] = future
+                futures[future] = url
+        done, _ = wait(futures, timeout=config.ARTICLE_DEADLINE)
+        for future, url in futures.items():
+            # دریافتی که منبع دیگر بعد از مهلتش لغو کرده هم ناموفق حساب می‌شود
+            if future in done and not future.cancelled() and future.exception() is None:
+                results[url] = future.result()
+                count('articles.fetched')
+            else:
+                results[url] = None
+                count('articles.failed')
+        pool.shutdown(wait=False, cancel_futures=True)
+        return results
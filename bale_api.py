@@ -0,0 +1,79 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+
+class BaleAPIError(Exception):
+    """خطای برگشتی از API بله"""
+
+    def __init__(self, error_code, description, retry_after=None):
+        super().__init__(f"{error_code}: {description}")
+        self.error_code = error_code
+        self.description = description
+        self.retry_after = retry_after
+
+    @property
+    def transient(self):
+        """خطاهایی که با تلاش دوباره ممکن است برطرف شوند"""
+        return self.error_code == 429 or self.error_code >= 500
+
+    @property
+    def blocked(self):
+        """کاربر ربات را مسدود کرده یا گفتگو در دسترس نیست"""
+        return self.error_code == 403
+
+
+class BaleAPI:
+    """کلاینت سبک HTTP برای API ربات بله با اتصال‌های ماندگار"""
+
+    def __init__(self, token, base_url=None, pool_size=None, timeout=None):
+        self.token = token
+        # BALE_API_URL در محیط برای سرور آزمایشی محلی
+        self.base_url = base_url or os.getenv('BALE_API_URL') or config.BALE_API_URL
+        self.timeout = timeout or config.BALE_API_TIMEOUT
+        pool_size = pool_size or config.BROADCAST_WORKERS
+        self._local = threading.local()
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+    @property
+    def session(self):
+        # نشست جدا برای هر رشته؛ اتصال‌ها از استخر مشترک آداپتر می‌آیند
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            self._local.session = session
+        return session
+
+    def call(self, method, http_timeout=None, **params):
+        """فراخوانی یک متد API و برگرداندن result"""
+        url = self.base_url.format(token=self.token, method=method)
+        params = {k: v for k, v in params.items() if v is not None}
+        response = self.session.post(url, json=params, timeout=http_timeout or self.timeout)
+        try:
+            data = response.json()
+        except ValueError:
+            raise BaleAPIError(response.status_code, response.text[:200])
+        if not data.get('ok'):
+            retry_after = (data.get('parameters') or {}).get('retry_after')
+            if retry_after is None and response.headers.get('Retry-After'):
+                retry_after = float(response.headers['Retry-After'])
+            raise BaleAPIError(
+                data.get('error_code', response.status_code),
+                data.get('description', ''),
+                retry_after,
+            )
+        return data.get('result')
+
+    def send_message(self, chat_id, text, parse_mode=None):
+        return self.call('sendMessage', chat_id=chat_id, text=text, parse_mode=parse_mode)
+
+    def get_updates(self, offset=None, limit=None, timeout=None):
+        # در long polling مهلت HTTP باید از مهلت انتظار سرور بیشتر باشد
+        return self.call('getUpdates', http_timeout=self.timeout + (timeout or 0),
+                         offset=offset, limit=limit, timeout=timeout)
@@ -0,0 +1,43 @@
+"""ارسال گروهی به ۱۰ تا ۱۰۰ هزار کاربر روی API ساختگی بله
+
+اجرا:  python -m benchmarks.bench_broadcast [تعداد کاربران ...]
+"""
+import sys
+import time
+
+from bale_api import BaleAPI
+from benchmarks.fake_bale import FakeBale
+from broadcaster import Broadcaster, summarize
+
+
+def run(users, rate, workers, **fake_options):
+    with FakeBale(**fake_options) as fake:
+        api = BaleAPI('TOKEN', base_url=fake.url, pool_size=workers)
+        broadcaster = Broadcaster(api.send_message, rate=rate, workers=workers, base_delay=0.05)
+        start = time.perf_counter()
+        report = broadcaster.broadcast([str(i) for i in range(users)], ['پیام آزمایشی'])
+        elapsed = time.perf_counter() - start
+    return elapsed, summarize(report), fake.counts, len(fake.sent)
+
+
+def main(sizes):
+    ok = True
+    for users in sizes:
+        elapsed, summary, counts, delivered = run(
+            users, rate=100_000, workers=32, error_rate=0.01, blocked=range(0, users, 1000))
+        print(f"{users:>7} کاربر: {elapsed:6.1f}s  ({users / elapsed:,.0f} پیام/ثانیه)  "
+              f"موفق {summary['sent']}  مسدود {summary['blocked']}  ناموفق {summary['failed']}  "
+              f"تلاش دوباره {summary['retries']}  5xx سرور {counts['5xx']}")
+        ok &= delivered == summary['sent'] and summary['blocked'] == len(range(0, users, 1000))
+
+    # رعایت محدودیت نرخ: سرور بیش از ۲۰۰ پیام در ثانیه را با 429 رد می‌کند
+    elapsed, summary, counts, delivered = run(2000, rate=180, workers=16, rate_limit=200)
+    print(f"نرخ ۱۸۰/s زیر سقف ۲۰۰/s سرور: {elapsed:5.1f}s، 429: {counts['429']}، موفق {summary['sent']}")
+    elapsed, summary, counts, delivered = run(2000, rate=400, workers=16, rate_limit=200)
+    print(f"نرخ ۴۰۰/s بالای سقف سرور: {elapsed:5.1f}s، 429: {counts['429']}، موفق {summary['sent']}")
+    ok &= summary['sent'] == 2000
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main([int(a) for a in sys.argv[1:]] or [10_000]))
@@ -0,0 +1,56 @@
+"""درستی و سرعت parse_date روی قالب‌های تاریخ صفحه‌های منابع
+
+اجرا:  python -m benchmarks.bench_dates
+
+هر نمونه با تاریخ میلادی مورد انتظار مقایسه می‌شود؛ تاریخ شمسی در هر قالبی
+(ISO، اسلش، نام ماه) باید همان روز میلادی را بدهد.
+"""
+import sys
+import time
+from datetime import datetime
+
+import persian_time
+from persian_time import TEHRAN, parse_date
+
+REFERENCE = TEHRAN.localize(datetime(2026, 10, 18, 12, 0))
+
+# (متن، زمان مورد انتظار به وقت تهران، دقیق)
+CASES = [
+    # تاریخ بدون ساعت دقیق حساب نمی‌شود
+    ('۱۴۰۵/۰۷/۲۶', datetime(2026, 10, 18, 0, 0), False),
+    ('۱۴۰۵-۰۷-۲۶', datetime(2026, 10, 18, 0, 0), False),
+    ('1405-07-26', datetime(2026, 10, 18, 0, 0), False),
+    ('۲۶ مهر ۱۴۰۵', datetime(2026, 10, 18, 0, 0), False),
+    ('1405-07-26T09:30:00', datetime(2026, 10, 18, 9, 30), True),
+    ('1405-02-31 10:15', datetime(2026, 5, 21, 10, 15), True),
+    ('۲۶ مهر ۱۴۰۵ - ۱۰:۳۰', datetime(2026, 10, 18, 10, 30), True),
+    ('2026-10-18T06:00:00Z', datetime(2026, 10, 18, 9, 30), True),
+    ('2026/10/18', datetime(2026, 10, 18, 0, 0), False),
+    ('۲ ساعت پیش', datetime(2026, 10, 18, 10, 0), False),
+    ('دیروز ۱۰:۳۰', datetime(2026, 10, 17, 10, 30), False),
+]
+ROUNDS = 10000
+
+
+def main():
+    failed = 0
+    for text, expected, exact in CASES:
+        parsed = parse_date(text, REFERENCE)
+        got = (parsed[0].astimezone(TEHRAN).replace(tzinfo=None), parsed[1]) if parsed else None
+        if got != (expected, exact):
+            print(f"❌ {text}: {got} به جای {(expected, exact)}")
+            failed += 1
+
+    texts = [text for text, _, _ in CASES]
+    persian_time._parse.cache_clear()
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        parse_date(texts[i % len(texts)], REFERENCE)
+    elapsed = time.perf_counter() - start
+    print(f"⏱ {ROUNDS} تاریخ: {elapsed * 1000:.1f}ms ({elapsed / ROUNDS * 1e6:.2f}µs هر تاریخ)")
+    print(f"{len(CASES) - failed}/{len(CASES)} نمونه درست")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""زمان جستجوی خبر تکراری با رشد نمایه امضاها
+
+اجرا:  python -m benchmarks.bench_dedup
+"""
+import random
+import sys
+import time
+
+from dedup import NearDuplicateIndex, minhash, shingles
+
+LOOKUPS = 2000
+LETTERS = 'ابپتثجچحخدذرزسشصضطظعغفقکگلمنوهی'
+
+
+def make_vocabulary(rng, size=20_000):
+    """واژگان ساختگی به اندازه واژگان عنوان‌های خبری"""
+    return [''.join(rng.choice(LETTERS) for _ in range(rng.randint(2, 7))) for _ in range(size)]
+
+
+def make_title(rng, vocabulary):
+    # یک‌چهارم کلمه‌ها از ۲۰۰ کلمه پرتکرار، بقیه از کل واژگان
+    return ' '.join(rng.choice(vocabulary[:200] if rng.random() < 0.25 else vocabulary)
+                    for _ in range(rng.randint(6, 12)))
+
+
+def main():
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(rng)
+    worst = 0.0
+    for size in (1_000, 10_000, 100_000):
+        index = NearDuplicateIndex()
+        titles = [make_title(rng, vocabulary) for _ in range(size)]
+        for i, title in enumerate(titles):
+            index.add(shingles(title), {'title': title, 'id': i})
+
+        # نیمی از جستجوها نسخه کمی تغییرکرده یک عنوان موجود است
+        queries = []
+        for _ in range(LOOKUPS // 2):
+            words = rng.choice(titles).split()
+            words.append(rng.choice(vocabulary))
+            queries.append(' '.join(words))
+            queries.append(make_title(rng, vocabulary))
+        prepared = [(tokens, minhash(tokens)) for tokens in map(shingles, queries)]
+
+        start = time.perf_counter()
+        found = sum(1 for tokens, sig in prepared if index.find(tokens, sig) is not None)
+        per_lookup = (time.perf_counter() - start) / len(prepared)
+
+        start = time.perf_counter()
+        for q in queries[:200]:
+            minhash(shingles(q))
+        per_sig = (time.perf_counter() - start) / 200
+
+        worst = max(worst, per_lookup)
+        print(f"نمایه {size:>7}: جستجو {per_lookup * 1e6:7.1f}µs  "
+              f"ساخت امضا {per_sig * 1e6:6.1f}µs  پیداشده {found}/{len(prepared)}")
+    return 0 if worst < 1e-3 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""اجرای کامل بدون اینترنت: get_all_news و news_bot.main روی صفحه‌های ضبط‌شده و API ساختگی بله
+
+اجرا:  python -m benchmarks.bench_e2e [تعداد کاربران]
+
+صفحه‌ها از benchmarks/fixtures (ضبط با benchmarks.record) با همان تأخیر ضبط‌شده
+بازپخش می‌شوند؛ در نبود آن‌ها صفحه ساختگی هر منبع استفاده می‌شود.
+"""
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import config
+from benchmarks.fake_bale import FakeBale
+from benchmarks.fixtures import FIXTURE_DIR, load_fixtures, replay_routes
+from benchmarks.stubs import StubServer
+
+USERS = 500
+LATENCY_SCALE = 1.0
+# سقف نرخ واقعی بله در bench_broadcast سنجیده می‌شود؛ اینجا زمان خود کد مهم است
+BROADCAST_RATE = 5000
+
+STAGE_COUNTERS = [
+    ('items.found', 'ظرف خبری پیداشده'),
+    ('items.relevant', 'مرتبط'),
+    ('items.new', 'جدید در اجرا'),
+    ('news.new', 'بعد از حذف تکراری'),
+    ('news.duplicates', 'تکراری ادغام‌شده'),
+    ('messages', 'پیام خبرنامه'),
+    ('send.sent', 'ارسال موفق'),
+]
+
+
+def fresh_dir():
+    path = tempfile.mkdtemp()
+    os.chdir(path)
+    return path
+
+
+def point_sources(server, keys):
+    # قوانین نشانی منابع پیش از تغییر آدرس ساخته می‌شوند تا localhost قانون هیچ منبعی را نگیرد
+    from canonical import _rules_by_host
+    _rules_by_host()
+    for key in keys:
+        config.NEWS_SOURCES[key]['url'] = f'{server.url}/{key}'
+
+
+def print_spans(summary):
+    print(f"  {'بخش':<18}{'تعداد':>7}{'مجموع s':>10}{'بیشینه s':>10}")
+    for name, s in summary['spans'].items():
+        print(f"  {name:<18}{s['count']:>7}{s['seconds']:>10.3f}{s['max']:>10.3f}")
+
+
+def bench_scraper():
+    from metrics import metrics
+    from news_scraper import NewsScraper
+
+    results = {}
+    fresh_dir()
+    for label in ('cold', 'warm'):
+        # اجرای دوم با ETag ذخیره‌شده؛ همه صفحه‌ها 304 می‌گیرند
+        metrics.reset()
+        start = time.perf_counter()
+        news = NewsScraper().get_all_news()
+        results[label] = (time.perf_counter() - start, len(news), metrics.summary())
+
+    # حافظه در اجرای جدا؛ tracemalloc خودش کد را کند می‌کند
+    fresh_dir()
+    tracemalloc.start()
+    NewsScraper().get_all_news()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return results, peak
+
+
+def bench_bot(fake, users):
+    import news_bot
+    from metrics import metrics
+
+    fresh_dir()
+    with open('users.json', 'w', encoding='utf-8') as f:
+        json.dump([str(100_000 + i) for i in range(users)], f)
+    metrics.reset()
+    start = time.perf_counter()
+    news_bot.main()
+    return time.perf_counter() - start, metrics.summary()
+
+
+def main(users):
+    pages = load_fixtures()
+    recorded = sum(os.path.exists(os.path.join(FIXTURE_DIR, f'{key}.html')) for key in pages)
+    config.BROADCAST_RATE = BROADCAST_RATE
+    os.environ['BALE_TOKEN'] = 'TOKEN'
+
+    with StubServer(replay_routes(pages, scale=LATENCY_SCALE)) as server, FakeBale() as fake:
+        os.environ['BALE_API_URL'] = fake.url
+        point_sources(server, pages)
+        scraper_results, peak = bench_scraper()
+        bot_seconds, summary = bench_bot(fake, users)
+        sent = len(fake.sent)
+
+    print(f"\n📦 منابع: {len(pages)} (ضبط‌شده: {recorded}، ساختگی: {len(pages) - recorded})، "
+          f"حجم {sum(map(len, pages.values())) / 1024:.0f}KB")
+    for label, (seconds, items, stage) in scraper_results.items():
+        found = stage['counters'].get('items.found', 0)
+        print(f"\n🔍 get_all_news ({label}): {seconds:.2f}s، {items} خبر، "
+              f"{found / seconds:,.0f} ظرف/ثانیه")
+        print_spans(stage)
+    print(f"  حافظه اوج پایتون: {peak / 2**20:.1f}MB")
+
+    print(f"\n🤖 news_bot.main با {users} کاربر: {bot_seconds:.2f}s")
+    print_spans(summary)
+    send = summary['spans'].get('send', {}).get('seconds') or 0
+    if send:
+        print(f"  ارسال: {sent / send:,.0f} پیام/ثانیه")
+    print("  شمار در هر مرحله:")
+    for name, label in STAGE_COUNTERS:
+        print(f"    {label:<20}{summary['counters'].get(name, 0):>8}")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"\n💾 بیشینه RSS پردازه: {rss / 1024:.0f}MB")
+    return 0 if sent == users * summary['counters'].get('messages', 0) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else USERS))
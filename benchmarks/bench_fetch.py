@@ -0,0 +1,53 @@
+"""مقایسه دریافت ترتیبی و موازی منابع روی سرورهای محلی با تأخیر
+
+اجرا:  python -m benchmarks.bench_fetch
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import StubServer, sample_page
+
+LATENCIES = [0.2, 0.4, 0.6, 0.8, 1.0, 1.5, 2.0]
+
+
+def make_scraper(server):
+    from news_scraper import NewsScraper
+
+    scraper = NewsScraper()
+    scraper.sources = {
+        name: f'{server.url}/{i}' for i, name in enumerate(scraper.sources)
+    }
+    return scraper
+
+
+def run(scraper, concurrent):
+    start = time.perf_counter()
+    news = scraper.get_all_news(concurrent=concurrent)
+    return time.perf_counter() - start, [n['url'] for n in news]
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    page = sample_page()
+    routes = {f'/{i}': (page, delay) for i, delay in enumerate(LATENCIES)}
+    with StubServer(routes) as server:
+        seq = run(make_scraper(server), concurrent=False)
+        os.remove('http_cache.json')
+        par = run(make_scraper(server), concurrent=True)
+        # اجرای دوم با ETag ذخیره‌شده؛ همه صفحه‌ها 304 می‌گیرند
+        scraper = make_scraper(server)
+        cond = run(scraper, concurrent=True)
+        saved = scraper.fetcher.stats['bytes_saved']
+
+    print(f"ترتیبی: {seq[0]:.2f}s   موازی: {par[0]:.2f}s   "
+          f"(مجموع تأخیرها {sum(LATENCIES):.1f}s، کندترین {max(LATENCIES):.1f}s)")
+    print(f"خروجی یکسان: {seq[1] == par[1]}  ({len(par[1])} خبر)")
+    print(f"اجرای شرطی: {cond[0]:.2f}s، {server.not_modified} پاسخ 304، "
+          f"{saved / 1024:.1f}KB صرفه‌جویی")
+    return 0 if seq[1] == par[1] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
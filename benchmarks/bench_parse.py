@@ -0,0 +1,74 @@
+"""زمان پارس و حافظه اوج هر پارسر روی صفحه‌های ذخیره‌شده منابع
+
+اجرا:  python -m benchmarks.bench_parse
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import config
+from benchmarks.fixtures import load_fixtures
+
+ROUNDS = 5
+
+
+def measure(scraper, pages):
+    """میانگین زمان و حافظه اوج extract_page (پارس و استخراج) هر صفحه با تنظیمات اسکرپر"""
+    from news_scraper import extract_page
+
+    results = {}
+    for key, html in pages.items():
+        args = (html, scraper._selectors[key], scraper.sources[key], scraper.parser,
+                scraper._strainers.get(key))
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            entries = extract_page(*args)
+        elapsed = (time.perf_counter() - start) / ROUNDS
+
+        # tracemalloc فقط حافظه پایتون را می‌شمارد، نه بافرهای داخلی lxml
+        tracemalloc.start()
+        extract_page(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[key] = (elapsed, peak, [entry['url'] for entry in entries])
+    return results
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    from news_scraper import NewsScraper, resolve_parser
+
+    pages = load_fixtures()
+    backends = [('html.parser', False), ('html.parser', True)]
+    if resolve_parser('auto') == 'lxml':
+        backends += [('lxml', False), ('lxml', True)]
+    else:
+        print("⚠️ lxml نصب نیست؛ فقط html.parser اندازه‌گیری می‌شود")
+
+    baseline = None
+    print(f"{'پارسر':<24}{'منبع':<12}{'KB':>8}{'ms':>10}{'MB اوج':>10}")
+    for parser, partial in backends:
+        config.HTML_PARSER, config.PARTIAL_PARSE = parser, partial
+        scraper = NewsScraper()
+        results = measure(scraper, pages)
+        label = parser + (' + strainer' if partial else '')
+        for key, (elapsed, peak, _) in results.items():
+            print(f"{label:<24}{key:<12}{len(pages[key]) / 1024:>8.0f}"
+                  f"{elapsed * 1000:>10.1f}{peak / 2**20:>10.2f}")
+        total = sum(r[0] for r in results.values())
+        print(f"{label:<24}{'مجموع':<12}{'':>8}{total * 1000:>10.1f}")
+        urls = {key: r[2] for key, r in results.items()}
+        if baseline is None:
+            baseline = urls
+        elif urls != baseline:
+            print(f"❌ خروجی {label} با html.parser یکسان نیست")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""دور کامل منابع (iter_sources) با پارس در رشته‌های دریافت و در پردازه‌های پارس (PARSE_PROCESSES)
+
+اجرا:  python -m benchmarks.bench_parse_procs [تعداد منابع]
+
+منابع تنظیمات تا تعداد خواسته‌شده تکثیر می‌شوند و دریافت هر منبع صفحه
+ذخیره‌شده (یا ساختگی) آن را بی‌درنگ برمی‌گرداند تا فقط هزینه پارس، انتخاب خبر
+و جابه‌جایی بین پردازه‌ها سنجیده شود. زمان هر دور شامل ساخت استخر پردازه‌هاست،
+همان‌طور که در هر اجرای cron پرداخت می‌شود. خروجی هر حالت با حالت رشته‌ای
+مقایسه می‌شود.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import config
+from benchmarks.fixtures import load_fixtures
+
+SOURCES = 120
+ROUNDS = 3
+
+
+def sources_and_pages(total):
+    """(تنظیمات منابع تکثیرشده، html هر منبع)"""
+    fixtures = load_fixtures()
+    keys = [key for key in config.NEWS_SOURCES if key in fixtures]
+    sources = {}
+    pages = {}
+    for i in range(total):
+        key = keys[i % len(keys)]
+        copy_key = f"{key}_{i}"
+        sources[copy_key] = dict(config.NEWS_SOURCES[key], enabled=True,
+                                 name=f"{config.NEWS_SOURCES[key]['name']} {i}")
+        pages[copy_key] = fixtures[key]
+    return sources, pages
+
+
+def run(sources, pages):
+    """بهترین زمان ROUNDS دور iter_sources و آدرس خبرهای هر منبع"""
+    from news_scraper import NewsScraper
+
+    best = None
+    for _ in range(ROUNDS):
+        scraper = NewsScraper(sources)
+        scraper.fetch = pages.get
+        start = time.perf_counter()
+        results = dict(scraper.iter_sources(concurrent=True))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, {key: [news['url'] for news in news_list] for key, news_list in results.items()}
+
+
+def main(total=SOURCES):
+    os.chdir(tempfile.mkdtemp())
+    config.ARTICLE_BODIES = False
+    sources, pages = sources_and_pages(total)
+    size = sum(len(html) for html in pages.values()) / 2**20
+    print(f"📄 {len(pages)} منبع ({size:.1f}MB)، {os.cpu_count()} هسته\n")
+
+    results = []
+    for processes in [0] + sorted({1, 2, 4, os.cpu_count()}):
+        config.PARSE_PROCESSES = processes
+        # گزارش هر منبع در خروجی چاپ نمی‌شود
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            elapsed, urls = run(sources, pages)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        results.append((processes, elapsed, urls))
+
+    baseline_time, baseline_urls = results[0][1], results[0][2]
+    print(f"{sum(len(u) for u in baseline_urls.values())} خبر در هر دور\n")
+    print(f"{'پردازه':<12}{'ms':>10}{'منبع/ثانیه':>14}{'نسبت':>8}")
+    failed = False
+    for processes, elapsed, urls in results:
+        label = str(processes) if processes else 'رشته‌ها'
+        print(f"{label:<12}{elapsed * 1000:>10.1f}{len(pages) / elapsed:>14.0f}"
+              f"{baseline_time / elapsed:>7.2f}×")
+        if urls != baseline_urls:
+            print(f"❌ خروجی {processes} پردازه با حالت رشته‌ای یکسان نیست")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else SOURCES))
@@ -0,0 +1,101 @@
+"""زمان شروع اسکریپت‌های cron: زمان import (python -X importtime) و اجرای کامل bot_handler بدون پیام
+
+اجرا:  python -m benchmarks.bench_startup [--save]
+
+نتیجه با benchmarks/startup_baseline.json مقایسه می‌شود؛ بیش از TOLERANCE برابر
+کندتر یا بارگذاری ماژول سنگین در مسیر بدون پیام خطا حساب می‌شود. --save
+نتیجه همین ماشین را مبنای مقایسه می‌کند.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_bale import FakeBale
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'startup_baseline.json')
+ENTRY_POINTS = ['bot_handler', 'news_bot']
+# ماژول‌هایی که اجرای cron بدون پیام نباید بارگذاری کند
+HEAVY = {'bs4', 'lxml', 'soupsieve', 'jdatetime', 'pytz', 'cProfile'}
+RUNS = 7
+TOLERANCE = 1.5
+
+
+def import_time(module):
+    """(زمان کل import به میلی‌ثانیه، ماژول‌های بارگذاری‌شده، ۵ ماژول پرهزینه)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us)
+        if name.strip() == module:
+            # زمان خود پایتون (site) جزو هزینه اسکریپت نیست
+            total = int(cumulative_us)
+    top = sorted(modules.items(), key=lambda item: -item[1])[:5]
+    return total / 1000, set(modules), top
+
+
+def handler_run(fake):
+    """زمان اجرای کامل bot_handler.py (پردازه جدا) وقتی پیامی در صف نیست"""
+    env = dict(os.environ, BALE_TOKEN='TOKEN', BALE_API_URL=fake.url, PROFILE_FILE='')
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, 'bot_handler.py')],
+                       cwd=tempfile.mkdtemp(), env=env, capture_output=True, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(save=False):
+    results = {}
+    failed = []
+    for module in ENTRY_POINTS:
+        # اجرای اول فایل‌های pyc را می‌سازد
+        import_time(module)
+        total, modules, top = min((import_time(module) for _ in range(3)), key=lambda r: r[0])
+        results[module] = {'import_ms': round(total, 1)}
+        print(f"📦 import {module}: {total:.1f}ms")
+        for name, us in top:
+            print(f"    {name:<32}{us / 1000:>8.1f}ms")
+        heavy = sorted(name for name in modules if name.split('.')[0] in HEAVY)
+        if module == 'bot_handler' and heavy:
+            failed.append(f"bot_handler ماژول سنگین بارگذاری می‌کند: {', '.join(heavy)}")
+
+    with FakeBale() as fake:
+        results['bot_handler']['run_ms'] = round(handler_run(fake), 1)
+    print(f"\n🤖 اجرای bot_handler بدون پیام: {results['bot_handler']['run_ms']:.1f}ms (میانه {RUNS} اجرا)")
+
+    if save:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"💾 مبنا در {BASELINE_FILE} ذخیره شد")
+    elif os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n📏 مقایسه با مبنا:")
+        for module, values in results.items():
+            for name, value in values.items():
+                base = baseline.get(module, {}).get(name)
+                if not base:
+                    continue
+                ratio = value / base
+                print(f"  {module}.{name:<10}{base:>9.1f} → {value:>9.1f}ms ({ratio:.2f}×)")
+                if ratio > TOLERANCE:
+                    failed.append(f"{module}.{name} {ratio:.2f} برابر مبنا")
+
+    for message in failed:
+        print(f"❌ {message}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main('--save' in sys.argv))
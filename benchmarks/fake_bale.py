@@ -0,0 +1,103 @@
+"""سرور محلی شبیه API بله برای sendMessage و getUpdates"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeBale:
+    """API ساختگی بله با محدودیت نرخ و خطای تصادفی قابل تنظیم
+
+    rate_limit: حداکثر پیام در ثانیه؛ بیشتر از آن پاسخ 429 با retry_after
+    error_rate: احتمال پاسخ 502 برای هر درخواست
+    blocked: شناسه کاربرانی که ربات را مسدود کرده‌اند (پاسخ 403)
+    """
+
+    def __init__(self, rate_limit=None, error_rate=0.0, blocked=(), latency=0.0, seed=1):
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.blocked = {str(b) for b in blocked}
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.sent = []
+        self.updates = []
+        self.counts = {'requests': 0, '429': 0, '5xx': 0, '403': 0}
+        self._window = []
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+                method = self.path.rsplit('/', 1)[-1]
+                status, body = fake.handle(method, params)
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}/bot{{token}}/{{method}}'
+
+    def add_update(self, chat_id, text):
+        with self._lock:
+            update_id = len(self.updates) + 1
+            self.updates.append({
+                'update_id': update_id,
+                'message': {'message_id': update_id, 'chat': {'id': chat_id}, 'text': text},
+            })
+
+    def handle(self, method, params):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.counts['requests'] += 1
+            if method == 'getUpdates':
+                offset = params.get('offset') or 0
+                pending = [u for u in self.updates if u['update_id'] >= offset]
+                return 200, {'ok': True, 'result': pending[:params.get('limit') or 100]}
+            if method != 'sendMessage':
+                return 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+
+            if self.rate_limit:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.rate_limit:
+                    self.counts['429'] += 1
+                    return 429, {'ok': False, 'error_code': 429,
+                                 'description': 'Too Many Requests',
+                                 'parameters': {'retry_after': 1}}
+                self._window.append(now)
+            if self.rng.random() < self.error_rate:
+                self.counts['5xx'] += 1
+                return 502, {'ok': False, 'error_code': 502, 'description': 'Bad Gateway'}
+            chat_id = str(params.get('chat_id'))
+            if chat_id in self.blocked:
+                self.counts['403'] += 1
+                return 403, {'ok': False, 'error_code': 403,
+                             'description': 'Forbidden: bot was blocked by the user'}
+            self.sent.append((chat_id, params.get('text')))
+            return 200, {'ok': True, 'result': {'message_id': len(self.sent)}}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,101 @@
+"""صفحه‌های ذخیره‌شده منابع برای اندازه‌گیری بدون اینترنت"""
+import json
+import os
+import re
+
+import config
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TITLES = [
+    'افزایش صادرات گاز به ترکیه',
+    'نشست خبری وزیر ورزش',
+    'گازرسانی به ۲۰ روستای استان',
+    'پیش‌بینی هوای فردا',
+    'قطعی گاز در چند منطقه تهران',
+    'رشد تولید پتروشیمی در پارس جنوبی',
+]
+
+
+def _tag(selector):
+    """نام تگ و کلاس از اولین بخش یک انتخابگر ساده"""
+    part = re.sub(r'\[.*?\]', '', selector.split(',')[0].strip())
+    name, _, class_name = part.partition('.')
+    return name or 'div', class_name
+
+
+def _open(selector):
+    name, class_name = _tag(selector)
+    attrs = f' class="{class_name}"' if class_name else ''
+    return f'<{name}{attrs}>', f'</{name}>'
+
+
+def synthetic_page(source, items=40, filler=300):
+    """صفحه نخست ساختگی با ساختار انتخابگرهای یک منبع و حجم واقعی"""
+    selectors = source['selectors']
+    title = selectors['title']
+    title = title[0] if isinstance(title, list) else title
+    container_open, container_close = _open(selectors['container'])
+    title_open, title_close = _open(title)
+    date_open, date_close = _open(selectors.get('date') or 'span.date')
+
+    parts = ['<!DOCTYPE html><html lang="fa" dir="rtl"><head><meta charset="utf-8">',
+             f'<title>{source["name"]}</title>']
+    parts.extend(f'<script>var s{i} = {{"id": {i}, "v": "{"x" * 80}"}};</script>'
+                 for i in range(30))
+    parts.append('</head><body><header><nav><ul>')
+    parts.extend(f'<li class="menu-item"><a href="/service/{i}">سرویس {i}</a></li>'
+                 for i in range(filler // 3))
+    parts.append('</ul></nav></header><main><section class="news-list">')
+    for i in range(items):
+        parts.append(
+            f'{container_open}<figure><img src="/img/{i}.jpg" alt=""></figure>'
+            f'{title_open}<a href="/news/{140300000 + i}/slug-{i}">'
+            f'{TITLES[i % len(TITLES)]} {i}</a>{title_close}'
+            f'<p class="lead">{"خلاصه خبر " * 12}</p>'
+            f'{date_open}۲ ساعت پیش{date_close}{container_close}'
+        )
+    parts.append('</section><aside>')
+    parts.extend(f'<div class="ad"><p>{"متن تبلیغ " * 10}</p><a href="/ad/{i}">بیشتر</a></div>'
+                 for i in range(filler))
+    parts.append('</aside><footer>' + '<p>پانویس</p>' * 50 + '</footer></main></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def load_fixtures(sources=None):
+    """صفحه ضبط‌شده هر منبع از benchmarks/fixtures؛ در نبود آن صفحه ساختگی"""
+    sources = sources or {
+        key: source for key, source in config.NEWS_SOURCES.items()
+        if source.get('enabled', True)
+    }
+    pages = {}
+    for key, source in sources.items():
+        path = os.path.join(FIXTURE_DIR, f'{key}.html')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                pages[key] = f.read()
+        else:
+            pages[key] = synthetic_page(source)
+    return pages
+
+
+def load_manifest():
+    """اطلاعات ضبط (تأخیر، حجم، زمان ضبط) از fixtures/index.json"""
+    path = os.path.join(FIXTURE_DIR, 'index.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def replay_routes(pages, latency=0.3, scale=1.0):
+    """مسیرهای StubServer برای بازپخش: /<key> با تأخیر ضبط‌شده منبع
+
+    latency: تأخیر ثابت برای منابعی که تأخیر ضبط‌شده ندارند (صفحه ساختگی)
+    scale: ضریب تأخیرهای ضبط‌شده؛ 0 یعنی بدون تأخیر
+    """
+    manifest = load_manifest()
+    return {
+        f'/{key}': (page, manifest.get(key, {}).get('latency', latency) * scale)
+        for key, page in pages.items()
+    }
@@ -0,0 +1,60 @@
+"""ضبط صفحه نخست منابع خبری در benchmarks/fixtures برای اجرای بدون اینترنت
+
+اجرا:  python -m benchmarks.record [کلید منبع ...]
+
+بدنه هر پاسخ در fixtures/<key>.html و اطلاعات آن (آدرس، کد وضعیت، تأخیر،
+حجم) در fixtures/index.json ذخیره می‌شود. replay همین تأخیرها را بازسازی می‌کند.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+import config
+from benchmarks.fixtures import FIXTURE_DIR, load_manifest
+
+
+def record(key, source, headers):
+    start = time.perf_counter()
+    response = requests.get(source['url'], headers=headers, timeout=config.FETCH_TIMEOUT)
+    latency = time.perf_counter() - start
+    response.raise_for_status()
+    with open(os.path.join(FIXTURE_DIR, f'{key}.html'), 'wb') as f:
+        f.write(response.content)
+    return {
+        'url': source['url'],
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type'),
+        'latency': round(latency, 3),
+        'bytes': len(response.content),
+        'recorded_at': int(time.time()),
+    }
+
+
+def main(keys=None):
+    os.chdir(tempfile.mkdtemp())
+    from news_scraper import NewsScraper
+
+    scraper = NewsScraper()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    manifest = load_manifest()
+    failed = 0
+    for key in keys or scraper.source_configs:
+        source = scraper.source_configs[key]
+        try:
+            manifest[key] = record(key, source, scraper.headers)
+            print(f"✅ {source['name']}: {manifest[key]['bytes'] / 1024:.0f}KB "
+                  f"در {manifest[key]['latency']:.2f}s")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {source['name']}: {e}")
+    with open(os.path.join(FIXTURE_DIR, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
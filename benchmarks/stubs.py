@@ -0,0 +1,81 @@
+"""سرورهای HTTP محلی برای اندازه‌گیری بدون اینترنت"""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_TITLES = [
+    'افزایش صادرات گاز به ترکیه',
+    'نشست خبری وزیر ورزش',
+    'گازرسانی به ۲۰ روستای استان',
+    'پیش‌بینی هوای فردا',
+    'قطعی گاز در چند منطقه تهران',
+]
+
+
+def sample_page(items=40, prefix='/news/'):
+    """صفحه نمونه که ظرف‌های خبری همه منابع را دارد"""
+    parts = ['<html><head><meta charset="utf-8"><title>خبر</title></head><body>']
+    for i in range(items):
+        title = SAMPLE_TITLES[i % len(SAMPLE_TITLES)]
+        parts.append(
+            f'<div class="items list-item news-item item news">'
+            f'<h3><a href="{prefix}{1000 + i}/">{title} {i}</a></h3>'
+            f'<span class="date">۲ ساعت پیش</span></div>'
+        )
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+class StubServer:
+    """سرور محلی با تأخیر قابل تنظیم برای هر مسیر"""
+
+    def __init__(self, routes=None, latency=0.0):
+        # routes: مسیر -> (بدنه، تأخیر)
+        self.routes = routes or {}
+        self.latency = latency
+        self.hits = 0
+        self.not_modified = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                body, delay = stub.routes.get(self.path, (None, stub.latency))
+                time.sleep(delay)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
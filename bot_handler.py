@@ -1,60 +1,191 @@
 import os
+import sys
 import json
-from bale import Bot, Update
-from datetime import datetime
-import pytz
-import jdatetime
+import time
+import config
+from bale_api import BaleAPI
+from subscribers import SubscriberStore
+from metrics import metrics, span, count, profiled
+# تاریخ و موضوع‌ها (jdatetime، pytz، عبارت‌های منظم) فقط وقتی پیامی برای پاسخ
+# هست بارگذاری می‌شوند؛ اجرای cron بدون پیام فقط یک getUpdates می‌زند
 
-def load_users():
-    """بارگذاری لیست کاربران"""
+def load_offset():
+    """بارگذاری offset آخرین آپدیت پردازش‌شده"""
     try:
-        if os.path.exists('users.json'):
-            with open('users.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except:
-        pass
-    return []
+        if os.path.exists(config.UPDATE_OFFSET_FILE):
+            with open(config.UPDATE_OFFSET_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f).get('offset')
+    except Exception as e:
+        print(f"⚠️ خطا در خواندن offset: {e}")
+    return None
 
-def save_users(users):
-    """ذخیره لیست کاربران"""
+def save_offset(offset):
+    """ذخیره offset؛ نوشتن در فایل موقت و جایگزینی تا فایل نیمه‌کاره نماند"""
     try:
-        with open('users.json', 'w', encoding='utf-8') as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        tmp_path = config.UPDATE_OFFSET_FILE + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'offset': offset}, f)
+        os.replace(tmp_path, config.UPDATE_OFFSET_FILE)
         return True
     except Exception as e:
-        print(f"❌ خطا در ذخیره کاربران: {e}")
+        print(f"❌ خطا در ذخیره offset: {e}")
         return False
 
-def get_greeting_message():
-    """تولید پیام صبح‌بخیر با تاریخ"""
-    # تاریخ شمسی
-    now_jalali = jdatetime.datetime.now()
-    jalali_date = now_jalali.strftime('%Y/%m/%d')
-    jalali_day = now_jalali.strftime('%A')
+TOPICS_HELP = (
+    "🏷 *موضوع‌ها*\n"
+    "با موضوع، فقط خبرهای همان موضوع‌ها برایتان ارسال می‌شود:\n"
+    "/subscribe خط لوله — افزودن موضوع\n"
+    "/unsubscribe خط لوله — حذف موضوع\n"
+    "/unsubscribe — حذف همه موضوع‌ها (دریافت همه خبرها)\n"
+    "/topics — موضوع‌های فعلی"
+)
+
+def topics_message(users, chat_id):
+    """فهرست موضوع‌های کاربر"""
+    from digest import escape_markdown
+    topics = users.topics(chat_id)
+    if not topics:
+        return "📋 موضوعی ثبت نکرده‌اید؛ همه خبرها برایتان ارسال می‌شود.\n\n" + TOPICS_HELP
+    return "📋 موضوع‌های شما:\n" + '\n'.join(f"• {escape_markdown(topic)}" for topic in topics)
+
+def handle_topic_command(bot, users, chat_id, command, argument):
+    """دستورهای موضوع: /subscribe، /unsubscribe و /topics"""
+    from digest import escape_markdown
+    # نوشتار خود کاربر برای نمایش نگه داشته می‌شود؛ مقایسه و تطبیق با شکل یکسان‌شده است
+    topic = ' '.join(argument.split()) if argument else None
+    label = escape_markdown(topic or '')
+    if command == '/topics':
+        reply = topics_message(users, chat_id)
+    elif chat_id not in users:
+        reply = "⚠️ ابتدا با /start ثبت‌نام کنید."
+    elif command == '/subscribe':
+        if not topic:
+            reply = TOPICS_HELP
+        elif len(topic) > config.MAX_TOPIC_LENGTH:
+            reply = f"⚠️ موضوع حداکثر {config.MAX_TOPIC_LENGTH} حرف است."
+        elif users.subscribe(chat_id, topic):
+            count('topics.subscribed')
+            reply = f"✅ موضوع «{label}» اضافه شد.\n\n" + topics_message(users, chat_id)
+        elif users.has_topic(chat_id, topic):
+            reply = f"ℹ️ موضوع «{label}» از قبل ثبت شده است."
+        else:
+            reply = f"⚠️ حداکثر {config.MAX_TOPICS_PER_USER} موضوع می‌توانید داشته باشید."
+    else:
+        if users.unsubscribe(chat_id, topic):
+            count('topics.unsubscribed')
+            reply = ("✅ حذف شد.\n\n" if topic else "✅ همه موضوع‌ها حذف شد.\n\n") + topics_message(users, chat_id)
+        else:
+            reply = "ℹ️ چنین موضوعی ثبت نشده است.\n\n" + topics_message(users, chat_id)
+    bot.send_message(chat_id=chat_id, text=reply, parse_mode='markdown')
+
+# نام‌های کوتاه دستورها
+TOPIC_COMMANDS = {
+    '/subscribe': '/subscribe', '/sub': '/subscribe',
+    '/unsubscribe': '/unsubscribe', '/unsub': '/unsubscribe',
+    '/topics': '/topics',
+}
+
+def handle_update(bot, users, update):
+    """پردازش یک آپدیت"""
+    message = update.get('message') or {}
+    if not message.get('text'):
+        return
+    chat_id = str(message['chat']['id'])
+    text = message['text'].strip()
     
-    # تاریخ میلادی
-    now_gregorian = datetime.now(pytz.timezone('Asia/Tehran'))
-    gregorian_date = now_gregorian.strftime('%Y/%m/%d')
-    gregorian_day = now_gregorian.strftime('%A')
+    print(f"📨 پیام از {chat_id}: {text}")
     
-    # ترجمه روز
-    days_fa = {
-        'Saturday': 'شنبه',
-        'Sunday': 'یکشنبه',
-        'Monday': 'دوشنبه',
-        'Tuesday': 'سه‌شنبه',
-        'Wednesday': 'چهارشنبه',
-        'Thursday': 'پنج‌شنبه',
-        'Friday': 'جمعه'
-    }
+    # دستور /start
+    if text.lower() == '/start':
+        import persian_time
+        # اضافه کردن کاربر (ذخیره یک بار در پایان دسته)
+        if users.add(chat_id):
+            count('users.new')
+            print(f"✅ کاربر جدید: {chat_id}")
+        
+        # پیام خوش‌آمدگویی
+        welcome_msg = (
+            "🎉 *خوش آمدید به ربات خبری گاز ایران!*\n\n"
+            "✅ شما با موفقیت ثبت‌نام شدید!\n\n"
+            "از این پس هر روز:\n"
+            "📰 آخرین اخبار صنعت گاز\n"
+            "🏢 اخبار شرکت ملی گاز و شرکت مهندسی و توسعه گاز\n"
+            "👨‍💼 اخبار مرتبط با مهندس میرزایی\n"
+            "⚡️ اخبار خطوط لوله و ایستگاه‌های تقویت فشار\n\n"
+            "برای شما ارسال می‌شود!\n\n"
+            f"{TOPICS_HELP}\n\n"
+            f"{persian_time.greeting_message()}"
+        )
+        
+        bot.send_message(
+            chat_id=chat_id,
+            text=welcome_msg,
+            parse_mode='markdown'
+        )
+        print(f"✅ پیام خوش‌آمدگویی ارسال شد به {chat_id}")
+        return
     
-    return (
-        f"🌅 *صبح به‌خیر!*\n\n"
-        f"📅 امروز {days_fa.get(gregorian_day, gregorian_day)}:\n"
-        f"🗓 تاریخ شمسی: {jalali_date}\n"
-        f"🗓 تاریخ میلادی: {gregorian_date}\n\n"
-        f"☕️ روز خوبی داشته باشید!"
-    )
+    # دستورهای موضوع (/sub@bot_name هم پذیرفته می‌شود)
+    command, _, argument = text.partition(' ')
+    command = TOPIC_COMMANDS.get(command.split('@')[0].lower())
+    if command:
+        handle_topic_command(bot, users, chat_id, command, argument.strip())
+
+def process_batch(bot, users, updates, offset):
+    """پردازش یک دسته آپدیت و ذخیره offset بعد از کل دسته"""
+    for update in updates:
+        try:
+            with span('handle'):
+                handle_update(bot, users, update)
+        except Exception as e:
+            print(f"❌ خطا در پردازش آپدیت {update.get('update_id')}: {e}")
+            count('errors.update')
+        offset = max(offset or 0, update['update_id'] + 1)
+    count('updates', len(updates))
+    # کاربران پیش از offset ذخیره می‌شوند تا با قطع اجرا ثبت‌نامی گم نشود
+    with span('flush'):
+        users.flush()
+    # تأیید دسته‌ای: offset بعدی همه آپدیت‌های این دسته را در سرور تأیید می‌کند
+    if updates:
+        save_offset(offset)
+    return offset
+
+def run_once(bot):
+    """حالت cron: پردازش همه آپدیت‌های صف و خروج؛ خروجی کاربران یا None اگر پیامی نبود"""
+    offset = load_offset()
+    users = None
+    while True:
+        with span('poll'):
+            updates = bot.get_updates(offset=offset, limit=config.UPDATES_BATCH_SIZE)
+        if not updates:
+            break
+        if users is None:
+            users = SubscriberStore()
+        offset = process_batch(bot, users, updates, offset)
+    return users
+
+def run_daemon(bot, users):
+    """حالت سرویس: long polling و پاسخ در لحظه رسیدن پیام"""
+    offset = load_offset()
+    print(f"🔁 حالت سرویس با long polling ({config.LONG_POLL_TIMEOUT} ثانیه)")
+    while True:
+        try:
+            updates = bot.get_updates(
+                offset=offset,
+                limit=config.UPDATES_BATCH_SIZE,
+                timeout=config.LONG_POLL_TIMEOUT
+            )
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            print(f"⚠️ خطا در دریافت آپدیت‌ها: {e}")
+            time.sleep(5)
+            continue
+        if updates:
+            # تاریخ پیام خوش‌آمد با گذشت روز عوض می‌شود
+            import persian_time
+            persian_time.reset()
+        offset = process_batch(bot, users, updates, offset)
 
 def main():
     print("🤖 شروع پردازش پیام‌ها...")
@@ -65,53 +196,30 @@ def main():
         return
     
     try:
-        bot = Bot(token=token)
-        users = load_users()
+        bot = BaleAPI(token=token)
         
-        # دریافت آپدیت‌های جدید
-        updates = bot.get_updates()
-        
-        for update in updates:
-            if update.message and update.message.text:
-                chat_id = str(update.message.chat.id)
-                text = update.message.text.strip()
-                
-                print(f"📨 پیام از {chat_id}: {text}")
-                
-                # دستور /start
-                if text.lower() == '/start':
-                    # اضافه کردن کاربر
-                    if chat_id not in users:
-                        users.append(chat_id)
-                        save_users(users)
-                        print(f"✅ کاربر جدید: {chat_id}")
-                    
-                    # پیام خوش‌آمدگویی
-                    welcome_msg = (
-                        "🎉 *خوش آمدید به ربات خبری گاز ایران!*\n\n"
-                        "✅ شما با موفقیت ثبت‌نام شدید!\n\n"
-                        "از این پس هر روز:\n"
-                        "📰 آخرین اخبار صنعت گاز\n"
-                        "🏢 اخبار شرکت ملی گاز و شرکت مهندسی و توسعه گاز\n"
-                        "👨‍💼 اخبار مرتبط با مهندس میرزایی\n"
-                        "⚡️ اخبار خطوط لوله و ایستگاه‌های تقویت فشار\n\n"
-                        "برای شما ارسال می‌شود!\n\n"
-                        f"{get_greeting_message()}"
-                    )
-                    
-                    bot.send_message(
-                        chat_id=chat_id,
-                        text=welcome_msg,
-                        parse_mode='markdown'
-                    )
-                    print(f"✅ پیام خوش‌آمدگویی ارسال شد به {chat_id}")
+        if '--daemon' in sys.argv:
+            users = SubscriberStore()
+            run_daemon(bot, users)
+        else:
+            users = run_once(bot)
+            if users is None:
+                print("📭 پیام جدیدی نیست")
+                return
         
         print(f"🎯 تعداد کاربران ثبت‌شده: {len(users)}")
-        
+    
+    except KeyboardInterrupt:
+        print("👋 توقف سرویس")
     except Exception as e:
         print(f"❌ خطا: {e}")
+        count('errors.fatal')
         import traceback
         traceback.print_exc()
+    finally:
+        print(metrics.report())
+        metrics.save(config.HANDLER_METRICS_FILE)
 
 if __name__ == "__main__":
-    main()
+    with profiled():
+        main()
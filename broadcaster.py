@@ -0,0 +1,155 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import config
+from bale_api import BaleAPIError
+
+
+class TokenBucket:
+    """محدودکننده نرخ سطل توکن، مشترک بین همه رشته‌های ارسال
+
+    ظرفیت پیش‌فرض ۱ است تا ارسال یکنواخت باشد و هیچ پنجره یک‌ثانیه‌ای از rate بیشتر نشود.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """صبر تا آزاد شدن یک توکن"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """توقف همه ارسال‌ها؛ برای retry_after سرور"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class Broadcaster:
+    """ارسال هم‌زمان پیام‌ها به همه کاربران با محدودیت نرخ و تلاش دوباره"""
+
+    def __init__(self, send, rate=None, workers=None, max_retries=None, base_delay=None):
+        self.send = send
+        self.bucket = TokenBucket(rate or config.BROADCAST_RATE)
+        self.workers = workers or config.BROADCAST_WORKERS
+        self.max_retries = config.BROADCAST_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = config.BROADCAST_BASE_DELAY if base_delay is None else base_delay
+
+    def _send_one(self, chat_id, text):
+        """ارسال یک پیام با تلاش دوباره؛ خروجی (وضعیت، تعداد تلاش، خطا)"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.bucket.acquire()
+            try:
+                self.send(chat_id=chat_id, text=text, parse_mode='markdown')
+                return 'sent', attempt, None
+            except BaleAPIError as e:
+                if e.blocked:
+                    return 'blocked', attempt, str(e)
+                if not e.transient:
+                    # درخواست نادرست (گفتگوی ناموجود، خطای قالب پیام)؛ تلاش دوباره نتیجه‌ای ندارد
+                    return 'rejected', attempt, str(e)
+                if attempt > self.max_retries:
+                    return 'failed', attempt, str(e)
+                if e.retry_after:
+                    # محدودیت نرخ سمت سرور برای کل ربات است، نه فقط این کاربر
+                    self.bucket.pause(e.retry_after)
+                    continue
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt > self.max_retries:
+                    return 'failed', attempt, str(e)
+            except Exception as e:
+                return 'failed', attempt, str(e)
+            # عقب‌نشینی نمایی با jitter کامل
+            time.sleep(random.uniform(0, self.base_delay * 2 ** (attempt - 1)))
+
+    def _deliver(self, chat_id, messages, first=0, progress=None):
+        """ارسال پیام‌ها از بخش first به بعد؛ progress(تعداد بخش‌های ارسال‌شده) بعد از هر بخش"""
+        start = time.monotonic()
+        attempts = 0
+        for part, text in enumerate(messages[first:], first + 1):
+            status, tries, error = self._send_one(chat_id, text)
+            attempts += tries
+            if status != 'sent':
+                # retries فقط بخش‌های همین اجرا را حساب می‌کند؛ parts_sent از ابتدای پیام است
+                return {'chat_id': chat_id, 'status': status, 'attempts': attempts,
+                        'parts_sent': part - 1, 'retries': attempts - (part - first), 'error': error,
+                        'seconds': round(time.monotonic() - start, 3)}
+            if progress and part < len(messages):
+                progress(part)
+        return {'chat_id': chat_id, 'status': 'sent', 'attempts': attempts,
+                'parts_sent': len(messages), 'retries': attempts - (len(messages) - first), 'error': None,
+                'seconds': round(time.monotonic() - start, 3)}
+
+    def broadcast(self, recipients, messages):
+        """ارسال فهرست پیام‌ها (به ترتیب) به هر گیرنده؛ خروجی گزارش هر گیرنده"""
+        if isinstance(messages, str):
+            messages = [messages]
+        return self.broadcast_groups([(recipients, messages)])
+
+    def broadcast_groups(self, groups):
+        """ارسال پیام‌های هر گروه (گیرنده‌ها، پیام‌ها) با یک استخر و سطل توکن مشترک"""
+        return self.run_jobs([(chat_id, messages, 0) for recipients, messages in groups
+                              for chat_id in recipients])
+
+    def run_jobs(self, jobs, progress=None, done=None):
+        """ارسال کارهای (گیرنده، پیام‌ها، اولین بخش)؛ گزارش به ترتیب کارها
+
+        progress(شماره کار، بخش‌های ارسال‌شده) بعد از هر بخش میانی و done(شماره کار،
+        گزارش) بعد از هر گیرنده صدا زده می‌شوند؛ برای ثبت پیشرفت در صف ارسال.
+        """
+        def deliver(index):
+            chat_id, messages, first = jobs[index]
+            on_part = (lambda part: progress(index, part)) if progress else None
+            entry = self._deliver(chat_id, messages, first, on_part)
+            if done:
+                done(index, entry)
+            return entry
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(deliver, range(len(jobs))))
+
+
+def summarize(report):
+    sent = sum(1 for r in report if r['status'] == 'sent')
+    blocked = sum(1 for r in report if r['status'] == 'blocked')
+    rejected = sum(1 for r in report if r['status'] == 'rejected')
+    retries = sum(r['retries'] for r in report if r['status'] == 'sent')
+    return {'total': len(report), 'sent': sent, 'blocked': blocked, 'rejected': rejected,
+            'failed': len(report) - sent - blocked - rejected, 'retries': retries}
+
+
+def save_report(report, path=None):
+    """ذخیره گزارش تحویل هر گیرنده با زمان ارسال (artifact اجرا، نه فایل مخزن)"""
+    path = path or config.DELIVERY_REPORT_FILE
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'time': int(time.time()), 'summary': summarize(report), 'recipients': report},
+                      f, ensure_ascii=False, indent=2)
+        return True
+    except Exception as e:
+        print(f"❌ خطا در ذخیره گزارش تحویل: {e}")
+        return False
@@ -0,0 +1,82 @@
+import posixpath
+import re
+from functools import lru_cache
+from urllib.parse import quote, unquote, urljoin, urlsplit, urlunsplit
+
+import config
+
+# پارامترهای ردیابی که هیچ‌وقت خبر متفاوتی نمی‌سازند
+TRACKING_PARAMS = {'fbclid', 'gclid', 'yclid', 'mc_cid', 'mc_eid'}
+TRACKING_PREFIXES = ('utm_',)
+
+# نویسه‌هایی که در مسیر کدگذاری نمی‌شوند (RFC 3986)
+_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+
+def _host(netloc):
+    return netloc.lower().rstrip('.').removeprefix('www.')
+
+
+@lru_cache(maxsize=1)
+def _rules_by_host():
+    """قواعد هر منبع بر اساس میزبان آدرس آن در NEWS_SOURCES"""
+    rules = {}
+    for source in config.NEWS_SOURCES.values():
+        parts = urlsplit(source['url'])
+        pattern = source.get('article_path')
+        rules[_host(parts.netloc)] = {
+            # میزبان تنظیمات منبع؛ isna.ir و www.isna.ir یک آدرس می‌شوند
+            'host': parts.netloc.lower().rstrip('.'),
+            'https': parts.scheme == 'https',
+            'article_path': re.compile(pattern) if pattern else None,
+            'strip_params': set(source.get('strip_params', ())),
+        }
+    return rules
+
+
+def canonicalize(url, base=None):
+    """شکل یکتای آدرس خبر برای مقایسه و ذخیره در آرشیو"""
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https'):
+        return url
+
+    netloc = parts.netloc.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+    if port in (80, 443):
+        netloc = netloc.rsplit(':', 1)[0]
+    netloc = netloc.rstrip('.')
+    rules = _rules_by_host().get(_host(netloc), {})
+    netloc = rules.get('host', netloc)
+    # منبعی که روی https است، نسخه http همان خبر را هم https می‌کند
+    if scheme == 'http' and rules.get('https'):
+        scheme = 'https'
+
+    # نامک فارسی کدگذاری‌شده و نشده یک شکل پیدا می‌کنند
+    path = quote(unquote(parts.path), safe=_PATH_SAFE) or '/'
+    path = posixpath.normpath(path) if path != '/' else path
+    if path.startswith('//'):
+        path = '/' + path.lstrip('/')
+
+    article_path = rules.get('article_path')
+    match = article_path.match(path) if article_path else None
+    if match:
+        # شناسه خبر کافی است؛ نامک و پارامترها کنار گذاشته می‌شوند
+        return urlunsplit((scheme, netloc, match.group(0), '', ''))
+
+    # پارامترها با همان کدگذاری اصلی نگه داشته و فقط مرتب می‌شوند
+    strip = rules.get('strip_params', set())
+    query = []
+    for param in parts.query.split('&'):
+        name = unquote(param.split('=', 1)[0])
+        if not param or name in TRACKING_PARAMS or name in strip or name.startswith(TRACKING_PREFIXES):
+            continue
+        query.append(param)
+    query.sort()
+    return urlunsplit((scheme, netloc, path, '&'.join(query), ''))
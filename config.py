@@ -1,7 +1,94 @@
+# منابع خبری؛ افزودن منبع جدید فقط یک ورودی در این فهرست است
+# title می‌تواند فهرستی از انتخابگرها باشد که به ترتیب اولویت امتحان می‌شوند
+# filter=False یعنی همه خبرهای منبع مرتبط‌اند (سایت‌های شرکتی)
+# article_path بخشی از مسیر که شناسه خبر را دارد؛ بقیه آدرس (نامک، پارامترها) حذف می‌شود
+# strip_params پارامترهای اضافه‌ای که برای این منبع در آدرس خبر بی‌اثرند
+# weight وزن منبع در ترتیب خبرنامه (پیش‌فرض 1)
+# page_url آدرس صفحه‌های بعد فهرست خبرها با {page}؛ برای خواندن خبرهای جامانده در بررسی طول روز
 NEWS_SOURCES = {
+    'isna': {
+        'name': 'ایسنا',
+        'url': 'https://www.isna.ir',
+        'article_path': r'^/news/\d+',
+        'selectors': {
+            'container': 'div.items',
+            'title': ['h3', 'h2'],
+            'link': 'a[href]',
+            'date': 'time'
+        }
+    },
+    'irna': {
+        'name': 'ایرنا',
+        'url': 'https://www.irna.ir',
+        'article_path': r'^/news/\d+',
+        'selectors': {
+            'container': 'div.list-item',
+            'title': ['h3', 'h2'],
+            'link': 'a[href]',
+            'date': 'time'
+        }
+    },
+    'farsnews': {
+        'name': 'فارس',
+        'url': 'https://www.farsnews.ir',
+        'article_path': r'^/news/\d+',
+        'selectors': {
+            'container': 'div.news-item',
+            'title': ['h3', 'h2'],
+            'link': 'a[href]',
+            'date': 'time'
+        }
+    },
+    'mehrnews': {
+        'name': 'مهر',
+        'url': 'https://www.mehrnews.com',
+        'article_path': r'^/news/\d+',
+        'selectors': {
+            'container': 'div.item',
+            'title': ['h3', 'h2'],
+            'link': 'a[href]',
+            'date': 'time'
+        }
+    },
+    'tasnimnews': {
+        'name': 'تسنیم',
+        'url': 'https://www.tasnimnews.com',
+        'article_path': r'^/fa/news/\d{4}/\d{2}/\d{2}/\d+',
+        'selectors': {
+            'container': 'div.list-item',
+            'title': ['h3', 'h2'],
+            'link': 'a[href]',
+            'date': 'time'
+        }
+    },
+    'igedc': {
+        'name': 'شرکت توزیع گاز اصفهان',
+        'url': 'https://www.igedc.ir',
+        'filter': False,
+        'selectors': {
+            'container': 'div.news, div.post, div.item, article.news, article.post, article.item',
+            'title': 'h1, h2, h3, h4',
+            'link': 'a[href]',
+            'date': 'span.date'
+        }
+    },
     'nigc': {
+        'name': 'شرکت ملی گاز ایران',
+        'url': 'https://my.nigc.ir',
+        'filter': False,
+        'weight': 1.5,
+        'selectors': {
+            'container': 'div.news, div.post, div.item, article.news, article.post, article.item',
+            'title': 'h1, h2, h3, h4',
+            'link': 'a[href]',
+            'date': 'span.news-date'
+        }
+    },
+    # آدرس و انتخابگرهای قبلی سایت شرکت ملی گاز
+    'nigc_www': {
         'name': 'شرکت ملی گاز ایران',
         'url': 'https://www.nigc.ir/News',
+        'enabled': False,
         'selectors': {
             'container': 'div.news-item',
             'title': 'h3.news-title',
@@ -12,6 +99,7 @@ NEWS_SOURCES = {
     'gedco': {
         'name': 'شرکت گاز استان گیلان',
         'url': 'https://www.gedco.ir/News',
+        'enabled': False,
         'selectors': {
             'container': 'div.news-box',
             'title': 'h4.title',
@@ -22,6 +110,7 @@ NEWS_SOURCES = {
     'igc': {
         'name': 'شرکت بین‌المللی گاز ایران',
         'url': 'https://www.igc.ir/news',
+        'enabled': False,
         'selectors': {
             'container': 'article.news-item',
             'title': 'h2.entry-title',
@@ -32,6 +121,7 @@ NEWS_SOURCES = {
     'shana': {
         'name': 'شانا - خبرگزاری نفت',
         'url': 'https://www.shana.ir/news',
+        'enabled': False,
         'selectors': {
             'container': 'div.item-news',
             'title': 'h3.title-news',
@@ -42,6 +132,7 @@ NEWS_SOURCES = {
     'irangas': {
         'name': 'ایران گاز',
         'url': 'https://www.irangas.org.ir/news',
+        'enabled': False,
         'selectors': {
             'container': 'div.news-card',
             'title': 'h4.card-title',
@@ -53,6 +144,86 @@ NEWS_SOURCES = {
 
 # تنظیمات ربات
 BALE_API_URL = "https://tapi.bale.ai/bot{token}/{method}"
+BALE_API_TIMEOUT = 10
+USERS_FILE = "users.json"    # کاربران ثبت‌نام‌شده و وضعیت آن‌ها
+DELIVERY_STATE_FILE = "delivery_state.json"  # زمان آخرین ارسال موفق هر کاربر؛ در کش اجراها، نه مخزن
+UPDATE_OFFSET_FILE = "update_offset.json"  # آخرین آپدیت پردازش‌شده bot_handler
+UPDATES_BATCH_SIZE = 100     # حداکثر آپدیت در هر getUpdates
+LONG_POLL_TIMEOUT = 30       # انتظار سرور در حالت سرویس (--daemon)
 MAX_MESSAGE_LENGTH = 4000
-ARCHIVE_FILE = "news_archive.json"
+ARCHIVE_FILE = "news_archive.jsonl"  # با پسوند .gz فشرده؛ کوچک‌تر ولی بدون diff خط‌به‌خط در گیت
+LEGACY_ARCHIVE_FILE = "news_archive.json"  # قالب قدیمی؛ در اولین اجرا منتقل می‌شود
+ARCHIVE_RETENTION_DAYS = 90  # خبرهای قدیمی‌تر از آرشیو حذف می‌شوند
+DEDUP_THRESHOLD = 0.6        # حداقل شباهت ژاکارد عنوان‌ها برای خبر تکراری
+DEDUP_WINDOW_DAYS = 3        # خبرهای ارسال‌شده این چند روز برای تکرار بررسی می‌شوند
+
+# تنظیمات دریافت صفحات
+FETCH_TIMEOUT = 10          # سقف زمان دریافت هر منبع (ثانیه)
+FETCH_DEADLINE = 30         # سقف زمان کل دریافت همه منابع (ثانیه)
+FETCH_MAX_WORKERS = 8       # حداکثر دریافت هم‌زمان
+FETCH_CONCURRENT = True     # دریافت موازی منابع
+MAX_ITEMS_PER_SOURCE = 20   # تعداد ظرف‌های خبری بررسی‌شده در هر صفحه
+MAX_NEWS_AGE_HOURS = 48     # خبری که تاریخ انتشارش قدیمی‌تر باشد ارسال نمی‌شود
+HTTP_POOL_SIZE = 4          # اتصال‌های ماندگار هر میزبان
+HTTP_CACHE_FILE = "http_cache.json"  # ETag و Last-Modified هر صفحه
+
+# بررسی طول روز (python news_bot.py --poll)
+POLL_STATE_FILE = "source_watermarks.json"  # آخرین خبر دیده‌شده هر منبع
+NEWS_BUFFER_FILE = "news_buffer.jsonl"      # خبرهای پیداشده تا خبرنامه روزانه
+POLL_MAX_PAGES = 3           # حداکثر صفحه‌های خوانده‌شده از هر منبع در هر بررسی
+POLL_SEEN_URLS = 100         # آدرس‌های دیده‌شده برای منابع بدون شناسه و تاریخ
+
+# متن خبرها (مرحله دوم)
+ARTICLE_BODIES = False       # مرحله اختیاری: دریافت صفحه هر خبر برای خلاصه و تشخیص ارتباط از روی متن
+                             # (تا ARTICLE_MAX_PER_RUN صفحه و ARTICLE_DEADLINE ثانیه بیشتر در هر اجرا)
+ARTICLE_CACHE_FILE = "article_cache.json"  # متن استخراج‌شده؛ هر خبر فقط یک بار دریافت می‌شود
+ARTICLE_CACHE_MAX_ENTRIES = 3000
+ARTICLE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+ARTICLE_MAX_PER_RUN = 120    # سقف دریافت در هر اجرا؛ بقیه در اجرای بعد
+ARTICLE_WORKERS = 8          # دریافت هم‌زمان کل
+ARTICLE_PER_HOST = 2         # دریافت هم‌زمان از یک سایت
+ARTICLE_TIMEOUT = 10         # مهلت هر صفحه خبر (ثانیه)
+ARTICLE_DEADLINE = 60        # سقف زمان کل مرحله (ثانیه)
+ARTICLE_MAX_CHARS = 3000     # متن نگه‌داشته‌شده از هر خبر
+ARTICLE_LEAD_MIN_CHARS = 40  # کوتاه‌تر از این پاراگراف لید حساب نمی‌شود
+ARTICLE_MIN_KEYWORDS = 2     # کلیدواژه‌های متمایز لازم در متن برای خبر مرتبط
+DIGEST_SUMMARY_CHARS = 160   # طول خلاصه هر خبر در خبرنامه
+
+# ترتیب خبرنامه و موضوع‌های کاربران
+RANK_KEYWORD_WEIGHT = 1.0    # امتیاز هر کلیدواژه متمایز خبر
+RANK_SOURCE_WEIGHT = 1.0     # ضریب وزن منبع؛ هر منبع دیگری که همین خبر را آورده نصف وزنش
+RANK_RECENCY_WEIGHT = 2.0    # امتیاز تازگی خبری که همین حالا منتشر شده
+RANK_RECENCY_HALF_LIFE = 12  # ساعت؛ امتیاز تازگی با این نیمه‌عمر کم می‌شود
+MAX_TOPICS_PER_USER = 10     # حداکثر موضوع هر کاربر
+MAX_TOPIC_LENGTH = 40        # حداکثر طول هر موضوع
+
+# سلامت منابع
+SOURCE_HEALTH_FILE = "source_health.json"
+HEALTH_WINDOW = 20           # تعداد تأخیرهای اخیر نگه‌داشته‌شده برای هر منبع (فقط پاسخ کامل 200)
+HEALTH_MIN_SAMPLES = 5       # کمتر از این، مهلت همان FETCH_TIMEOUT است
+HEALTH_TIMEOUT_FACTOR = 3    # مهلت = صدک ۹۵ تأخیر × این ضریب
+FETCH_MIN_TIMEOUT = 3        # کف مهلت تطبیقی (ثانیه)
+HEALTH_FAILURE_THRESHOLD = 3  # خطای پشت سر هم تا باز شدن مدارشکن
+HEALTH_COOLDOWN = 6 * 3600   # استراحت اولیه منبع خراب (ثانیه)؛ با هر خطای بعدی دو برابر
+HEALTH_MAX_COOLDOWN = 3 * 86400
+
+# تنظیمات پارس HTML
+HTML_PARSER = 'auto'        # auto (lxml در صورت نصب) یا html.parser یا lxml
+PARTIAL_PARSE = True        # فقط ظرف‌های خبری ساخته شوند (SoupStrainer)
+PARSE_PROCESSES = 0         # پارس در پردازه‌های جدا برای منابع زیاد؛ 0 خاموش، -1 به تعداد هسته‌ها
+PARSE_CHUNK = 4             # صفحه‌های هر کار پردازه پارس
+
+# تنظیمات ارسال گروهی
+BROADCAST_RATE = 20          # حداکثر پیام در ثانیه برای کل ربات
+BROADCAST_WORKERS = 8        # ارسال هم‌زمان
+BROADCAST_MAX_RETRIES = 4    # تلاش دوباره برای خطاهای گذرا (429، 5xx، شبکه)
+BROADCAST_BASE_DELAY = 1.0   # پایه عقب‌نشینی نمایی (ثانیه)
+DELIVERY_REPORT_FILE = "delivery_report.json"
+SEND_QUEUE_FILE = "send_queue.jsonl"  # پیام‌های ساخته‌شده و پیشرفت ارسال هر گیرنده
+SEND_QUEUE_MAX_RUNS = 6      # اجراهایی که گیرنده ناموفق دوباره امتحان می‌شود (بررسی‌ها هر ۲۰ دقیقه)
+SEND_QUEUE_MAX_AGE_HOURS = 20  # ارسال قدیمی‌تر (خبرنامه دیروز) ادامه داده نمی‌شود
 
+# اندازه‌گیری اجرا
+METRICS_FILE = "run_metrics.json"            # زمان بخش‌ها و شمارنده‌های news_bot
+HANDLER_METRICS_FILE = "handler_metrics.json"  # همان برای bot_handler
+PROFILE_FILE = None          # مسیر خروجی cProfile؛ با متغیر محیطی PROFILE_FILE هم فعال می‌شود
@@ -0,0 +1,114 @@
+import hashlib
+import re
+import struct
+import time
+
+import config
+from persian_text import normalize
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# هر کلمه با یک shake_128 به NUM_PERM هش مستقل ۳۲ بیتی تبدیل می‌شود
+_UNPACK = struct.Struct(f'<{NUM_PERM}I').unpack
+
+# کلمه‌های پرتکراری که شباهت عنوان‌ها را بی‌جهت بالا می‌برند
+STOPWORDS = {
+    'و', 'در', 'به', 'از', 'با', 'برای', 'را', 'که', 'این', 'آن', 'تا',
+    'بر', 'یک', 'شد', 'می', 'است', 'های', 'ها', 'هم',
+}
+_WORD = re.compile(r'\w+')
+
+
+def shingles(title):
+    """مجموعه کلمه‌های معنادار عنوان نرمال‌شده"""
+    words = _WORD.findall(normalize(title))
+    return {w for w in words if w not in STOPWORDS} or set(words)
+
+
+def minhash(tokens):
+    """امضای MinHash مجموعه کلمه‌ها"""
+    vectors = [_UNPACK(hashlib.shake_128(t.encode('utf-8')).digest(NUM_PERM * 4)) for t in tokens]
+    if not vectors:
+        return None
+    return list(map(min, zip(*vectors)))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """نمایه LSH امضاهای اخیر؛ هر جستجو فقط چند سطل را بررسی می‌کند"""
+
+    def __init__(self, threshold=None):
+        if threshold is None:
+            threshold = config.DEDUP_THRESHOLD
+        self.threshold = threshold
+        self.buckets = {}
+        self.items = []
+
+    @staticmethod
+    def _keys(signature):
+        return [(b, tuple(signature[b * ROWS:(b + 1) * ROWS])) for b in range(BANDS)]
+
+    def add(self, tokens, item, signature=None):
+        signature = signature or minhash(tokens)
+        if signature is None:
+            return
+        idx = len(self.items)
+        self.items.append((tokens, item))
+        for key in self._keys(signature):
+            self.buckets.setdefault(key, []).append(idx)
+
+    def find(self, tokens, signature=None):
+        """شبیه‌ترین مورد با شباهت ژاکارد حداقل threshold یا None"""
+        signature = signature or minhash(tokens)
+        if signature is None:
+            return None
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in self._keys(signature):
+            for idx in self.buckets.get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                score = jaccard(tokens, self.items[idx][0])
+                if score >= best_score:
+                    best, best_score = self.items[idx][1], score
+        return best
+
+    def __len__(self):
+        return len(self.items)
+
+    @classmethod
+    def from_archive(cls, archive, window_days=None):
+        """نمایه عنوان خبرهای ارسال‌شده در چند روز اخیر"""
+        if window_days is None:
+            window_days = config.DEDUP_WINDOW_DAYS
+        cutoff = time.time() - window_days * 86400
+        index = cls()
+        for record in archive.records.values():
+            if record.get('title') and record['ts'] >= cutoff:
+                index.add(shingles(record['title']), record)
+        return index
+
+
+def iter_unique(news_iter, index, duplicates=None):
+    """خبرهای یکتا به محض رسیدن؛ تکراری‌ها به خوشه خبر قبلی اضافه و در duplicates جمع می‌شوند"""
+    for news in news_iter:
+        tokens = shingles(news['title'])
+        signature = minhash(tokens)
+        match = index.find(tokens, signature)
+        if match is None:
+            news['sources'] = [news['source']]
+            index.add(tokens, news, signature)
+            yield news
+            continue
+        if duplicates is not None:
+            duplicates.append(news)
+        # تکراری همین اجرا به خوشه اضافه می‌شود؛ تکراری روزهای قبل فقط کنار می‌رود
+        if 'sources' in match and news['source'] not in match['sources']:
+            match['sources'].append(news['source'])
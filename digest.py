@@ -0,0 +1,105 @@
+import re
+
+import config
+from persian_time import date_header, now
+
+# نویسه‌های ویژه Markdown بله که در متن خبر باید گریز داده شوند
+_MARKDOWN_SPECIAL = re.compile(r'([_*`\[\]])')
+# جا برای سرتیتر «ادامه اخبار» در پیام‌های دوم به بعد
+CONTINUATION_RESERVE = 40
+
+
+def escape_markdown(text):
+    """گریز نویسه‌های ویژه Markdown در عنوان و نام منبع"""
+    return _MARKDOWN_SPECIAL.sub(r'\\\1', text)
+
+
+def markdown_link(url):
+    # پرانتز بسته آدرس، پیوند Markdown را زودتر از موعد تمام می‌کند
+    return url.replace(')', '%29').replace(' ', '%20')
+
+
+def _details(news, indent, summary=True, link=True):
+    """خلاصه، منبع و پیوند یک خبر"""
+    sources = '، '.join(news.get('sources', [news['source']]))
+    text = summary and news.get('summary')
+    summary = ''
+    if text:
+        if len(text) > config.DIGEST_SUMMARY_CHARS:
+            text = text[:config.DIGEST_SUMMARY_CHARS - 1] + '…'
+        summary = f"{indent}📝 {escape_markdown(text)}\n"
+    link = f"{indent}🔗 [مطالعه خبر]({markdown_link(news['url'])})\n" if link else ''
+    return f"{summary}{indent}📡 منبع: {escape_markdown(sources)}\n{link}"
+
+
+def render_item(idx, news, max_length=None, limit=None):
+    """متن یک خبر در فهرست؛ عنوان خیلی بلند کوتاه می‌شود
+
+    limit: سقف طول کل خبر؛ اگر خبر (مثلاً با آدرس خیلی بلند) بیشتر باشد اول
+    خلاصه و بعد پیوند کنار گذاشته می‌شود تا خبر در یک پیام جا شود.
+    """
+    title = news['title']
+    if max_length and len(title) > max_length:
+        title = title[:max_length - 1] + '…'
+    title = f"*{idx}. {escape_markdown(title)}*\n"
+    for summary, link in ((True, True), (False, True), (False, False)):
+        item = title + _details(news, '   ', summary, link) + "\n"
+        if not limit or len(item) <= limit:
+            break
+    return item
+
+
+def render_alert(news):
+    """پیام فوری یک خبر در حالت هشدار"""
+    title = news['title'][:config.MAX_MESSAGE_LENGTH // 4]
+    title = f"🔔 *{escape_markdown(title)}*\n\n"
+    for summary, link in ((True, True), (False, True), (False, False)):
+        message = title + _details(news, '', summary, link)
+        if len(message) <= config.MAX_MESSAGE_LENGTH:
+            break
+    return message
+
+
+def render_digest(news_list, max_length=None, topics=None):
+    """پیام(های) خبرنامه روزانه؛ هر پیام زیر سقف طول و فقط در مرز خبرها شکسته می‌شود
+
+    خروجی یک بار برای هر مجموعه موضوع ساخته می‌شود و برای همه گیرنده‌های
+    آن استفاده می‌شود.
+    """
+    max_length = max_length or config.MAX_MESSAGE_LENGTH
+    limit = max_length - CONTINUATION_RESERVE
+    head = "🌅 *صبح به‌خیر!*\n\n" + date_header()
+    if topics:
+        head += f"🏷 موضوع‌های شما: {escape_markdown('، '.join(sorted(topics)))}\n\n"
+    footer = f"\n⏰ ساعت ارسال: {now().strftime('%H:%M')}"
+    
+    if not news_list:
+        where = "موضوع‌های شما" if topics else "منابع"
+        return [head + (
+            f"📰 امروز خبر جدیدی در {where} یافت نشد.\n\n"
+            "🔄 فردا دوباره بررسی می‌کنیم!"
+        ) + footer]
+    
+    head += f"📰 *{len(news_list)} خبر جدید از صنعت گاز:*\n\n"
+    chunks = [[head]]
+    size = len(head)
+    # عنوانی که به‌تنهایی از یک پیام بلندتر باشد کوتاه می‌شود (گریز تا دو برابر طول)
+    title_limit = (limit - len(head) - 200 - 2 * config.DIGEST_SUMMARY_CHARS) // 2
+    for idx, news in enumerate(news_list, 1):
+        # هر خبر باید به‌تنهایی (حتی کنار سرتیتر پیام اول) در یک پیام جا شود
+        item = render_item(idx, news, title_limit, limit - len(head))
+        # پیام خالی (یا فقط سرتیتر) شکسته نمی‌شود
+        if size + len(item) > limit and len(chunks[-1]) > (1 if len(chunks) == 1 else 0):
+            chunks.append([])
+            size = 0
+        chunks[-1].append(item)
+        size += len(item)
+    if size + len(footer) > limit:
+        chunks.append([])
+    chunks[-1].append(footer)
+    
+    total = len(chunks)
+    messages = [''.join(chunks[0])]
+    for number, parts in enumerate(chunks[1:], 2):
+        messages.append(f"📰 *ادامه اخبار ({number}/{total})*\n\n" + ''.join(parts))
+    return messages
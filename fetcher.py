@@ -0,0 +1,121 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from state_files import read_json, write_json
+
+
+class Fetcher:
+    """لایه مشترک دریافت صفحات با اتصال ماندگار و درخواست شرطی"""
+
+    def __init__(self, headers, cache_file=None):
+        self.headers = dict(headers)
+        self.headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        self.cache_file = cache_file or config.HTTP_CACHE_FILE
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'bytes_received': 0,
+            'bytes_decoded': 0,
+            'bytes_saved': 0,
+        }
+        self.load_validators()
+
+    def load_validators(self):
+        """بارگذاری ETag و Last-Modified ذخیره‌شده از اجرای قبل"""
+        self.validators = {}
+        try:
+            self.validators = read_json(self.cache_file, {})
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن {self.cache_file}: {e}")
+
+    def save_validators(self):
+        """ذخیره اعتبارسنج‌ها برای اجرای بعدی؛ فقط در صورت تغییر"""
+        try:
+            write_json(self.cache_file, self.validators)
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {self.cache_file}: {e}")
+
+    def session(self, url):
+        """نشست ماندگار برای هر میزبان"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_SIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, timeout=None, conditional=True):
+        """دریافت صفحه؛ اگر از اجرای قبل تغییری نکرده None برمی‌گرداند
+
+        conditional=False برای صفحه‌هایی که جای دیگری کش می‌شوند (متن خبرها)؛
+        اعتبارسنج آن‌ها در http_cache.json نگه داشته نمی‌شود.
+        """
+        timeout = timeout or config.FETCH_TIMEOUT
+        deadline = time.monotonic() + timeout
+        headers = {}
+        cached = self.validators.get(url, {}) if conditional else {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        session = self.session(url)
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                self._count(not_modified=1, bytes_saved=cached.get('size', 0))
+                return None
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(64 * 1024):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"دریافت {url} بیش از {timeout} ثانیه طول کشید")
+                chunks.append(chunk)
+            content = b''.join(chunks)
+            wire_size = response.raw.tell() or len(content)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        self._count(
+            bytes_received=wire_size,
+            bytes_decoded=len(content),
+            bytes_saved=len(content) - wire_size,
+        )
+        if not conditional:
+            return content
+        with self._lock:
+            if etag or last_modified:
+                self.validators[url] = {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'size': wire_size,
+                }
+            else:
+                self.validators.pop(url, None)
+        return content
+
+    def _count(self, **values):
+        with self._lock:
+            self.stats['requests'] += 1
+            for key, value in values.items():
+                self.stats[key] += value
+
+    def report(self):
+        """خلاصه مصرف شبکه این اجرا"""
+        s = self.stats
+        return (
+            f"🌐 درخواست‌ها: {s['requests']} | بدون تغییر (304): {s['not_modified']} | "
+            f"دریافتی: {s['bytes_received'] / 1024:.1f}KB | "
+            f"صرفه‌جویی: {s['bytes_saved'] / 1024:.1f}KB"
+        )
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+
+class Metrics:
+    """زمان‌سنجی بخش‌های اجرا و شمارنده‌ها؛ خروجی JSON برای مقایسه اجراها
+
+    زمان هر span جمع زمان همه فراخوانی‌های آن است؛ برای بخش‌هایی که در چند
+    رشته هم‌زمان اجرا می‌شوند (مثل fetch) این عدد از زمان واقعی بیشتر است.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.spans = {}
+        self.counters = {}
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            entry = self.spans.setdefault(name, {'count': 0, 'seconds': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        with self._lock:
+            return {
+                'started': int(self.started),
+                'seconds': round(time.perf_counter() - self._start, 3),
+                'spans': {
+                    name: {'count': s['count'], 'seconds': round(s['seconds'], 4),
+                           'max': round(s['max'], 4)}
+                    for name, s in sorted(self.spans.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def report(self):
+        """یک خط خلاصه زمان بخش‌های اصلی برای لاگ اجرا"""
+        summary = self.summary()
+        parts = [f"{name} {s['seconds']:.2f}s" for name, s in summary['spans'].items()
+                 if '.' not in name]
+        return f"⏱ کل {summary['seconds']:.2f}s | " + ' | '.join(parts)
+
+    def save(self, path=None):
+        path = path or config.METRICS_FILE
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {path}: {e}")
+            return False
+
+
+# شمارنده مشترک یک اجرا
+metrics = Metrics()
+span = metrics.span
+count = metrics.count
+
+
+@contextmanager
+def profiled(path=None):
+    """پروفایل cProfile کل اجرا وقتی PROFILE_FILE (محیط یا تنظیمات) تعیین شده باشد"""
+    path = path or os.getenv('PROFILE_FILE') or config.PROFILE_FILE
+    if not path:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 پروفایل در {path} ذخیره شد")
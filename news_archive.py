@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import time
+
+import config
+from canonical import canonicalize
+from state_files import append_lines, read_lines, write_lines
+
+
+def url_hash(url):
+    """هش کوتاه و پایدار شکل یکتای URL برای نمایه آرشیو"""
+    return hashlib.sha1(canonicalize(url).encode('utf-8')).hexdigest()[:16]
+
+
+class NewsArchive:
+    """آرشیو یکپارچه خبرهای ارسال‌شده؛ فایل JSONL فقط‌افزودنی با نمایه هش URL
+
+    هر رکورد فقط هش URL و زمان ارسال است؛ عنوان تا DEDUP_WINDOW_DAYS برای
+    تشخیص خبر تکراری نگه داشته و در بازنویسی بعدی حذف می‌شود.
+    """
+
+    def __init__(self, path=None, legacy_path=None, retention_days=None):
+        self.path = path or config.ARCHIVE_FILE
+        self.legacy_path = legacy_path or config.LEGACY_ARCHIVE_FILE
+        if retention_days is None:
+            retention_days = config.ARCHIVE_RETENTION_DAYS
+        self.retention = retention_days * 86400
+        self.records = {}
+        self.load()
+
+    def __contains__(self, url):
+        return url_hash(url) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def load(self):
+        """بارگذاری آرشیو؛ در اولین اجرا قالب‌های قدیمی news_archive.json منتقل می‌شوند"""
+        self.records = {}
+        if not os.path.exists(self.path):
+            if os.path.exists(self.legacy_path):
+                self.migrate_legacy()
+            return
+
+        cutoff = time.time() - self.retention
+        expired = 0
+        outdated = False
+        for record in read_lines(self.path):
+            if record.get('ts', 0) < cutoff:
+                expired += 1
+                continue
+            if 'url' in record:
+                # قالب قبلی با URL و منبع کامل
+                outdated = True
+                record = self._record(record['h'], record['ts'], record.get('title'))
+            self.records[record['h']] = record
+
+        # بازنویسی فقط وقتی بخش قابل‌توجهی از فایل منقضی شده باشد
+        if outdated or (expired and expired >= len(self.records) // 10):
+            self.compact()
+
+    def migrate_legacy(self):
+        """انتقال فهرست URLها (NewsScraper) یا فهرست خبرها (news_bot) به قالب جدید"""
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن آرشیو قدیمی: {e}")
+            return
+
+        news_list = []
+        for entry in legacy:
+            if isinstance(entry, str):
+                news_list.append({'url': entry})
+            elif isinstance(entry, dict) and (entry.get('url') or entry.get('link')):
+                news = dict(entry)
+                news['url'] = entry.get('url') or entry.get('link')
+                news_list.append(news)
+
+        for news in news_list:
+            self._remember(news)
+        self.compact()
+        os.remove(self.legacy_path)
+        print(f"📦 {len(self.records)} خبر از آرشیو قدیمی منتقل شد")
+
+    @staticmethod
+    def _record(h, ts, title=None):
+        record = {'h': h, 'ts': int(ts)}
+        if title:
+            record['title'] = title
+        return record
+
+    def _remember(self, news, ts=None):
+        h = url_hash(news['url'])
+        if h in self.records:
+            return None
+        record = self._record(h, ts or time.time(), news.get('title'))
+        self.records[h] = record
+        return record
+
+    def add_many(self, news_list):
+        """افزودن خبرهای ارسال‌شده به انتهای فایل"""
+        now = time.time()
+        new_records = [r for r in (self._remember(n, now) for n in news_list) if r]
+        if not new_records:
+            return 0
+        try:
+            # همان ترتیب compact تا بازنویسی بعدی خطوط را جابه‌جا نکند
+            append_lines(self.path, sorted(new_records, key=lambda r: r['h']))
+            print(f"✅ {len(new_records)} خبر به آرشیو اضافه شد")
+        except Exception as e:
+            print(f"❌ خطا در ذخیره آرشیو: {e}")
+        return len(new_records)
+
+    def compact(self):
+        """بازنویسی فایل فقط با رکوردهای معتبر؛ عنوان خبرهای بیرون از بازه تکرار حذف می‌شود"""
+        cutoff = time.time() - config.DEDUP_WINDOW_DAYS * 86400
+        for h, record in self.records.items():
+            if 'title' in record and record['ts'] < cutoff:
+                self.records[h] = self._record(h, record['ts'])
+        write_lines(self.path, sorted(self.records.values(), key=lambda r: (r['ts'], r['h'])))
@@ -1,80 +1,158 @@
 import os
-import json
-from datetime import datetime
-import pytz
-import jdatetime
-from news_scraper import NewsScraper
-from bale import Bot
+import sys
+from itertools import chain
+from bale_api import BaleAPI
+from subscribers import SubscriberStore
+from broadcaster import Broadcaster, save_report, summarize
+from metrics import metrics, span, count, profiled
+from polling import NewsBuffer
+from send_queue import SendQueue
+# اسکرپر (bs4، lxml)، خبرنامه و تاریخ (jdatetime، pytz) فقط در مسیری که لازم است
+# بارگذاری می‌شوند؛ اجرای بدون توکن یا کاربر زود تمام می‌شود
 
 def load_users():
-    """بارگذاری لیست کاربران"""
-    try:
-        if os.path.exists('users.json'):
-            with open('users.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except:
-        pass
-    return []
+    """بارگذاری لیست کاربران فعال"""
+    return SubscriberStore().active()
 
-def load_sent_news():
-    """بارگذاری اخبار ارسال‌شده"""
-    try:
-        if os.path.exists('news_archive.json'):
-            with open('news_archive.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except:
-        pass
-    return []
+def record_delivery(report, subscribers):
+    """ثبت نتیجه ارسال هر کاربر در فهرست کاربران و چاپ خطاها"""
+    for entry in report:
+        if entry['status'] == 'sent':
+            subscribers.mark_delivered(entry['chat_id'])
+        else:
+            if entry['status'] == 'blocked':
+                subscribers.mark_blocked(entry['chat_id'])
+            print(f"❌ خطا در ارسال به {entry['chat_id']}: {entry['error']}")
+    summary = summarize(report)
+    for name in ('sent', 'blocked', 'rejected', 'failed', 'retries'):
+        count(f'send.{name}', summary[name])
+    return summary
 
-def save_sent_news(news_list):
-    """ذخیره اخبار ارسال‌شده"""
-    try:
-        with open('news_archive.json', 'w', encoding='utf-8') as f:
-            json.dump(news_list, f, ensure_ascii=False, indent=2)
-        print("✅ آرشیو ذخیره شد")
-        return True
-    except Exception as e:
-        print(f"❌ خطا در ذخیره: {e}")
-        return False
+def deliver(queue, batch_id, broadcaster, subscribers):
+    """ارسال یک دسته ثبت‌شده در صف؛ خروجی گزارش گیرنده‌ها"""
+    with span('send'):
+        report = queue.deliver(broadcaster, queue.jobs([batch_id]))
+    record_delivery(report, subscribers)
+    return report
 
-def get_date_header():
-    """تولید هدر تاریخ"""
-    now_jalali = jdatetime.datetime.now()
-    jalali_date = now_jalali.strftime('%Y/%m/%d')
-    
-    now_gregorian = datetime.now(pytz.timezone('Asia/Tehran'))
-    gregorian_date = now_gregorian.strftime('%Y/%m/%d')
-    
-    return (
-        f"🗓 *تاریخ امروز*\n"
-        f"📅 شمسی: {jalali_date}\n"
-        f"📅 میلادی: {gregorian_date}\n\n"
-    )
+def resume_pending(queue, broadcaster, users, subscribers):
+    """ادامه ارسال‌های نیمه‌تمام اجراهای قبل با همان پیام‌های ساخته‌شده"""
+    jobs = queue.jobs(active=set(users))
+    if not jobs:
+        return []
+    print(f"♻️ ادامه ارسال نیمه‌تمام: {len(jobs)} گیرنده")
+    count('send.resumed', len(jobs))
+    with span('resume'):
+        report = queue.deliver(broadcaster, jobs)
+    summary = record_delivery(report, subscribers)
+    print(f"📤 ادامه ارسال موفق: {summary['sent']}/{len(jobs)}")
+    return report
+
+def send_digest(news_stream, broadcaster, index, subscribers, queue, archive, skip_empty=False):
+    """حالت روزانه: خبرها به ترتیب امتیاز در یک خبرنامه برای هر مجموعه موضوع؛ خروجی (خبرها، گزارش)
 
-def format_news_message(news_list):
-    """فرمت پیام خبری"""
-    message = "🌅 *صبح به‌خیر!*\n\n"
-    message += get_date_header()
+    skip_empty: خبرنامه «خبر جدیدی نبود» فرستاده نشود (بعد از ادامه ارسال قطع‌شده).
+    """
+    from digest import render_digest
+    from topics import rank
+    with span('scrape'):
+        new_news = list(news_stream)
+    print(f"🆕 اخبار جدید: {len(new_news)}")
+    count('news.new', len(new_news))
+    if not new_news and skip_empty:
+        return new_news, []
     
-    if not news_list:
-        message += (
-            "📰 امروز خبر جدیدی در منابع یافت نشد.\n\n"
-            "🔄 فردا دوباره بررسی می‌کنیم!"
-        )
-    else:
-        message += f"📰 *{len(news_list)} خبر جدید از صنعت گاز:*\n\n"
-        
-        for idx, news in enumerate(news_list, 1):
-            message += f"*{idx}. {news['title']}*\n"
-            message += f"   📡 منبع: {news['source']}\n"
-            message += f"   🔗 [مطالعه خبر]({news['url']})\n\n"
+    # آماده‌سازی پیام‌ها (یک بار برای هر گروه کاربران با موضوع‌های یکسان)
+    with span('render'):
+        new_news = rank(new_news)
+        groups = [(chat_ids, render_digest(news_list, topics=topics))
+                  for topics, chat_ids, news_list in index.split(new_news)]
+    users = sum(len(chat_ids) for chat_ids, _ in groups)
+    rendered = sum(len(messages) for _, messages in groups)
+    print(f"📝 تعداد پیام‌های خبرنامه: {rendered} ({len(groups)} گروه موضوع)")
+    count('digest.groups', len(groups))
+    count('messages', rendered)
     
-    now = datetime.now(pytz.timezone('Asia/Tehran'))
-    message += f"\n⏰ ساعت ارسال: {now.strftime('%H:%M')}"
+    # پیام‌ها در صف ماندگار ثبت و خبرها بایگانی می‌شوند؛ با قطع اجرا اجرای بعد
+    # ارسال را ادامه می‌دهد و خبرها دوباره اسکرپ و ارسال نمی‌شوند
+    batch_id = queue.enqueue(groups)
+    if new_news:
+        with span('archive'):
+            archive.add_many(new_news)
     
-    return message
+    # ارسال به همه کاربران (هم‌زمان، با محدودیت نرخ و تلاش دوباره)
+    report = deliver(queue, batch_id, broadcaster, subscribers)
+    summary = summarize(report)
+    print(f"📤 ارسال موفق: {summary['sent']}/{users} (تلاش دوباره: {summary['retries']})")
+    return new_news, report
+
+def send_alerts(news_stream, broadcaster, index, subscribers, queue, archive):
+    """حالت هشدار: هر خبر به محض رسیدن جداگانه به مشترکان موضوعش ارسال و بایگانی می‌شود؛ خروجی (خبرها، گزارش)"""
+    from digest import render_alert
+    sent_news = []
+    full_report = []
+    blocked = set()
+    for news in news_stream:
+        recipients = [chat_id for chat_id in index.recipients(news) if chat_id not in blocked]
+        print(f"🔔 {news['title']} ({len(recipients)} کاربر)")
+        batch_id = None
+        if recipients:
+            with span('render'):
+                message = render_alert(news)
+            batch_id = queue.enqueue([(recipients, [message])], kind='alert')
+            count('messages')
+        # بایگانی فوری تا با قطع اجرا خبر دوباره ارسال نشود؛ بقیه ارسال در صف می‌ماند
+        archive.add_many([news])
+        sent_news.append(news)
+        if batch_id:
+            report = deliver(queue, batch_id, broadcaster, subscribers)
+            full_report.extend(report)
+            # کاربری که ربات را مسدود کرده هشدارهای بعدی را نمی‌گیرد
+            blocked.update(entry['chat_id'] for entry in report if entry['status'] == 'blocked')
+    count('news.new', len(sent_news))
+    print(f"📤 هشدارهای ارسال‌شده: {len(sent_news)}")
+    return sent_news, full_report
 
-def main():
+def resume_queue():
+    """ادامه ارسال‌های نیمه‌تمام در بررسی‌های طول روز تا پیش از پایان مهلت صف"""
+    queue = SendQueue()
+    if not queue.jobs():
+        return
+    token = os.getenv('BALE_TOKEN')
+    if not token:
+        print("⚠️ ارسال نیمه‌تمام در صف است ولی توکن پیدا نشد")
+        return
+    subscribers = SubscriberStore()
+    broadcaster = Broadcaster(BaleAPI(token=token).send_message)
+    report = resume_pending(queue, broadcaster, subscribers.active(), subscribers)
+    if report:
+        save_report(report)
+    subscribers.flush()
+    queue.compact()
+
+def poll():
+    """بررسی طول روز: خبرهای تازه‌تر از نشانگر هر منبع به صف خبرنامه روزانه اضافه می‌شوند"""
+    print("🔄 بررسی اخبار تازه...")
+    try:
+        # خبرنامه قطع‌شده یا گیرنده‌های ناموفق تا خبرنامه فردا منتظر نمی‌مانند
+        resume_queue()
+        from news_scraper import NewsScraper
+        scraper = NewsScraper()
+        buffer = NewsBuffer()
+        # خبرهای صف دوباره اضافه نمی‌شوند
+        scraper.archived_urls.update(news['url'] for news in buffer.load())
+        for key, news_list in scraper.iter_sources(poll=True):
+            buffer.add_many(scraper.claim(news_list))
+    except Exception as e:
+        print(f"❌ خطای کلی: {e}")
+        count('errors.fatal')
+        import traceback
+        traceback.print_exc()
+    finally:
+        print(metrics.report())
+        metrics.save()
+
+def main(alert=False):
     print("🚀 شروع ربات خبری...")
     
     token = os.getenv('BALE_TOKEN')
@@ -83,62 +161,79 @@ def main():
         return
     
     try:
-        bot = Bot(token=token)
+        bot = BaleAPI(token=token)
         print("✅ ربات ساخته شد")
         
         # بارگذاری کاربران
-        users = load_users()
+        subscribers = SubscriberStore()
+        subscriptions = subscribers.subscriptions()
+        users = list(subscriptions)
         if not users:
             print("⚠️ هیچ کاربری ثبت‌نام نکرده!")
             return
         
         print(f"👥 تعداد کاربران: {len(users)}")
         
-        # جمع‌آوری اخبار
-        print("🔍 جستجوی اخبار...")
-        scraper = NewsScraper()
-        all_news = scraper.get_all_news()
-        print(f"📊 تعداد کل اخبار: {len(all_news)}")
+        # ارسال‌های نیمه‌تمام اجرای قطع‌شده قبل از هر کار دیگر
+        broadcaster = Broadcaster(bot.send_message)
+        queue = SendQueue()
+        report = resume_pending(queue, broadcaster, users, subscribers)
         
-        # فیلتر اخبار جدید
-        sent_news = load_sent_news()
-        sent_urls = {news.get('url', news.get('link', '')) for news in sent_news}
-        new_news = [news for news in all_news if news['url'] not in sent_urls]
-        print(f"🆕 اخبار جدید: {len(new_news)}")
+        from news_scraper import NewsScraper
+        from dedup import NearDuplicateIndex, iter_unique
+        from topics import TopicIndex
+        scraper = NewsScraper()
+        archive = scraper.archive
+        with span('dedup'):
+            recent_index = NearDuplicateIndex.from_archive(archive)
         
-        # آماده‌سازی پیام
-        message_text = format_news_message(new_news)
+        # خبرهای جمع‌شده در بررسی‌های طول روز پیش از خبرهای این اجرا
+        buffer = NewsBuffer()
+        buffered = [news for news in buffer.load() if news['url'] not in archive]
+        scraper.archived_urls.update(news['url'] for news in buffered)
+        if buffered:
+            print(f"📥 خبرهای صف: {len(buffered)}")
+        count('news.buffered', len(buffered))
         
-        # ارسال به همه کاربران
-        success_count = 0
-        for user_id in users:
-            try:
-                bot.send_message(
-                    chat_id=user_id,
-                    text=message_text,
-                    parse_mode='markdown'
-                )
-                success_count += 1
-                print(f"✅ ارسال به {user_id}")
-            except Exception as e:
-                print(f"❌ خطا در ارسال به {user_id}: {e}")
+        # زنجیره پردازش: هر منبع به محض دریافت → حذف خبرهای ارسال‌شده → ادغام تکراری‌ها
+        print("🔍 جستجوی اخبار...")
+        duplicate_news = []
+        fresh = (news for news in chain(buffered, scraper.iter_news()) if news['url'] not in archive)
+        news_stream = iter_unique(fresh, recent_index, duplicate_news)
+        index = TopicIndex(subscriptions)
         
-        print(f"📤 ارسال موفق: {success_count}/{len(users)}")
+        if alert:
+            _, sent_report = send_alerts(news_stream, broadcaster, index, subscribers, queue, archive)
+        else:
+            _, sent_report = send_digest(news_stream, broadcaster, index, subscribers, queue, archive,
+                                         skip_empty=bool(report))
+        report += sent_report
+        save_report(report)
+        subscribers.flush()
+        # خبرهای صف خبرنامه حالا در صف ارسال و آرشیو هستند
+        buffer.clear()
+        queue.compact()
         
-        # به‌روزرسانی آرشیو
-        if new_news:
-            sent_news.extend(new_news)
-            # نگه‌داری 1000 خبر آخر
-            if len(sent_news) > 1000:
-                sent_news = sent_news[-1000:]
-            save_sent_news(sent_news)
+        print(f"🧩 خبرهای تکراری ادغام‌شده: {len(duplicate_news)}")
+        count('news.duplicates', len(duplicate_news))
+        if duplicate_news:
+            with span('archive'):
+                archive.add_many(duplicate_news)
         
         print("🎉 کار تمام شد!")
         
     except Exception as e:
         print(f"❌ خطای کلی: {e}")
+        count('errors.fatal')
         import traceback
         traceback.print_exc()
+    finally:
+        print(metrics.report())
+        metrics.save()
 
 if __name__ == "__main__":
-    main()
+    with profiled():
+        if '--poll' in sys.argv:
+            poll()
+        else:
+            main(alert='--alert' in sys.argv)
@@ -1,20 +1,146 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import json
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+import re
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import multiprocessing
 import os
+import time
+import config
+from fetcher import Fetcher
+from source_health import SourceHealth
+from metrics import metrics, span, count
+from persian_text import KeywordMatcher
+from news_archive import NewsArchive
+from canonical import canonicalize
+from articles import ArticleFetcher
+from polling import Watermarks
+import persian_time
+from persian_time import parse_date, timestamp
+
+def compile_selectors(selectors):
+    """پیش‌کامپایل انتخابگرهای CSS یک منبع"""
+    titles = selectors['title']
+    if isinstance(titles, str):
+        titles = [titles]
+    return {
+        'container': soupsieve.compile(selectors['container']),
+        'title': [soupsieve.compile(title) for title in titles],
+        'link': soupsieve.compile(selectors['link']),
+        'date': soupsieve.compile(selectors['date']) if selectors.get('date') else None,
+    }
+
+# انتخابگر ساده مثل div.items یا article یا .news
+SIMPLE_SELECTOR = re.compile(r'([a-zA-Z][\w-]*)?(?:\.([\w-]+))?')
+
+def resolve_parser(name):
+    """انتخاب پارسر HTML؛ در حالت auto اگر lxml نصب باشد از آن استفاده می‌شود"""
+    if name != 'auto':
+        return name
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+def container_strainer(selector):
+    """SoupStrainer که فقط ظرف‌های خبری را می‌سازد؛ برای انتخابگرهای پیچیده None"""
+    names, classes = set(), set()
+    any_name = any_class = False
+    for part in selector.split(','):
+        match = SIMPLE_SELECTOR.fullmatch(part.strip())
+        if not match or not any(match.groups()):
+            return None
+        name, class_name = match.groups()
+        if name:
+            names.add(name)
+        else:
+            any_name = True
+        if class_name:
+            classes.add(class_name)
+        else:
+            any_class = True
+    
+    kwargs = {}
+    if not any_name:
+        kwargs['name'] = sorted(names)
+    if not any_class:
+        # class چندمقداری است؛ هر کلاس باید به‌صورت یک کلمه کامل پیدا شود
+        pattern = '|'.join(re.escape(c) for c in sorted(classes))
+        kwargs['class_'] = re.compile(rf'(?:^|\s)(?:{pattern})(?:\s|$)')
+    return SoupStrainer(**kwargs)
+
+def extract_page(html, selectors, base_url, parser, strainer=None):
+    """عنوان، آدرس یکتا و زمان انتشار ظرف‌های خبری یک صفحه؛ در رشته اصلی یا پردازه پارس"""
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
+    articles = selectors['container'].select(soup, limit=config.MAX_ITEMS_PER_SOURCE)
+    
+    entries = []
+    for article in articles:
+        link_tag = selectors['link'].select_one(article)
+        title_tag = None
+        for title_selector in selectors['title']:
+            title_tag = title_selector.select_one(article)
+            if title_tag:
+                break
+        
+        if link_tag and title_tag:
+            entry = {
+                'title': title_tag.get_text(strip=True),
+                'url': canonicalize(link_tag['href'], base_url),
+                'published': None,
+            }
+            date_tag = selectors['date'].select_one(article) if selectors['date'] else None
+            if date_tag:
+                parsed = parse_date(date_tag.get('datetime') or date_tag.get_text(strip=True))
+                if parsed:
+                    # تاریخ نسبی («۲ ساعت پیش») یا بدون ساعت برای ترتیب کافی است ولی نشانگر بررسی را جابه‌جا نمی‌کند
+                    entry['published'] = parsed[0].isoformat(timespec='seconds')
+                    entry['exact'] = parsed[1]
+            entries.append(entry)
+    return entries
+
+# وضعیت هر پردازه پارس: انتخابگرها یک بار در شروع پردازه کامپایل می‌شوند
+_worker = {}
+
+def _init_parse_worker(source_configs, parser, partial):
+    _worker['selectors'] = {key: compile_selectors(source['selectors'])
+                            for key, source in source_configs.items()}
+    _worker['strainers'] = {key: container_strainer(source['selectors']['container'])
+                            for key, source in source_configs.items()} if partial else {}
+    _worker['parser'] = parser
+
+def _parse_chunk(pages):
+    """پارس چند صفحه در پردازه جدا؛ خروجی (کلید، ظرف‌ها، زمان، خطا) هر صفحه"""
+    results = []
+    for key, html, base_url in pages:
+        start = time.perf_counter()
+        try:
+            entries = extract_page(html, _worker['selectors'][key], base_url,
+                                   _worker['parser'], _worker['strainers'].get(key))
+            results.append((key, entries, time.perf_counter() - start, None))
+        except Exception as e:
+            results.append((key, [], time.perf_counter() - start, str(e)))
+    return results
 
 class NewsScraper:
-    def __init__(self):
-        self.sources = {
-            'isna': 'https://www.isna.ir',
-            'irna': 'https://www.irna.ir',
-            'farsnews': 'https://www.farsnews.ir',
-            'mehrnews': 'https://www.mehrnews.com',
-            'tasnimnews': 'https://www.tasnimnews.com',
-            'igedc': 'https://www.igedc.ir',
-            'nigc': 'https://my.nigc.ir'
+    def __init__(self, sources=None):
+        self.source_configs = {
+            key: source
+            for key, source in (sources or config.NEWS_SOURCES).items()
+            if source.get('enabled', True)
+        }
+        self.sources = {key: source['url'] for key, source in self.source_configs.items()}
+        self._selectors = {
+            key: compile_selectors(source['selectors'])
+            for key, source in self.source_configs.items()
         }
+        self.parser = resolve_parser(config.HTML_PARSER)
+        self._strainers = {}
+        if config.PARTIAL_PARSE:
+            self._strainers = {
+                key: container_strainer(source['selectors']['container'])
+                for key, source in self.source_configs.items()
+            }
         
         self.keywords = [
             'گاز', 'نفت', 'انرژی', 'پالایش', 'پتروشیمی',
@@ -22,267 +148,380 @@ class NewsScraper:
             'وزارت نفت', 'گازرسانی', 'خط لوله', 'میعانات',
             'توزیع گاز', 'انشعاب گاز', 'قطعی گاز'
         ]
+        self.matcher = KeywordMatcher(self.keywords)
         
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        self.archive_file = 'news_archive.json'
-        self.load_archive()
+        self.archive = NewsArchive()
+        # URLهایی که در همین اجرا دیده شده‌اند
+        self.archived_urls = set()
+        self.fetcher = Fetcher(self.headers)
+        self.health = SourceHealth()
+        self.watermarks = Watermarks()
+        # مرحله دوم: متن خبرها برای خلاصه و تشخیص ارتباط خبرهایی که عنوانشان کلیدواژه ندارد
+        self.fetch_bodies = config.ARTICLE_BODIES
+        self.articles = ArticleFetcher(self.fetcher, parser=self.parser) if self.fetch_bodies else None
+        self._candidates = {}
+        # منابعی که دریافت صفحه‌شان در این اجرا تمام شده (موفق یا ناموفق)
+        self._fetched = set()
+        # پارس در پردازه‌های جدا برای فهرست بزرگ منابع؛ 0 یعنی در همان رشته‌های دریافت
+        self.parse_processes = config.PARSE_PROCESSES
+        self._processes = None
 
-    def load_archive(self):
-        if os.path.exists(self.archive_file):
-            with open(self.archive_file, 'r', encoding='utf-8') as f:
-                self.archived_urls = set(json.load(f))
-        else:
-            self.archived_urls = set()
-
-    def save_archive(self):
-        with open(self.archive_file, 'w', encoding='utf-8') as f:
-            json.dump(list(self.archived_urls), f, ensure_ascii=False, indent=2)
+    def is_archived(self, url):
+        """آیا خبر قبلاً ارسال شده یا در همین اجرا دیده شده"""
+        return url in self.archived_urls or url in self.archive
 
-    def is_relevant(self, text):
-        if not text:
-            return False
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.keywords)
+    def download(self, url, timeout=None):
+        """دریافت محتوای یک صفحه؛ None یعنی از اجرای قبل تغییری نکرده"""
+        return self.fetcher.get(url, timeout)
 
-    def scrape_isna(self):
-        news_list = []
+    def download_source(self, name):
+        """دریافت صفحه یک منبع با مهلت تطبیقی و ثبت در سلامت منبع"""
+        start = time.monotonic()
         try:
-            response = requests.get(self.sources['isna'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = soup.find_all('div', class_='items')[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find('h3') or article.find('h2')
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['isna'] + url
-                    
-                    if self.is_relevant(title) and url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'ایسنا'
-                        })
-                        self.archived_urls.add(url)
+            with span('scrape.fetch'):
+                content = self.download(self.sources[name], self.health.timeout(name))
         except Exception as e:
-            print(f"خطا در اسکرپ ایسنا: {e}")
-        
-        return news_list
+            self._fetched.add(name)
+            self.health.record_failure(name, e)
+            count('errors.fetch')
+            raise
+        self._fetched.add(name)
+        self.health.record_success(name, time.monotonic() - start,
+                                   304 if content is None else 200)
+        return content
 
-    def scrape_irna(self):
-        news_list = []
-        try:
-            response = requests.get(self.sources['irna'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = soup.find_all('div', class_='list-item')[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find('h3') or article.find('h2')
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['irna'] + url
-                    
-                    if self.is_relevant(title) and url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'ایرنا'
-                        })
-                        self.archived_urls.add(url)
-        except Exception as e:
-            print(f"خطا در اسکرپ ایرنا: {e}")
-        
-        return news_list
+    def fetch(self, name):
+        """محتوای صفحه یک منبع"""
+        return self.download_source(name)
+
+    def is_relevant(self, text):
+        return self.matcher.search(text)
 
-    def scrape_farsnews(self):
+    def matched_keywords(self, text):
+        """کلیدواژه‌های پیداشده در متن، برای امتیازدهی"""
+        return self.matcher.matches(text)
+
+    def is_relevant_body(self, article):
+        """ارتباط خبر از روی متن: کلیدواژه در لید یا چند کلیدواژه در متن"""
+        if self.is_relevant(article['lead']):
+            return True
+        return len(self.matched_keywords(article['text'])) >= config.ARTICLE_MIN_KEYWORDS
+
+    def add_article_bodies(self, key, news_list):
+        """افزودن خلاصه به خبرهای یک منبع و پذیرفتن نامزدهایی که متنشان مرتبط است"""
+        candidates = self._candidates.pop(key, [])
+        body_selector = self.source_configs[key]['selectors'].get('body')
+        articles = self.articles.fetch_many(
+            [(news['url'], body_selector) for news in news_list + candidates]
+        )
+        for news in news_list:
+            self._attach(news, articles.get(news['url']))
+        for news in candidates:
+            article = articles.get(news['url'])
+            if article and self.is_relevant_body(article):
+                self._attach(news, article)
+                news_list.append(news)
+                count('articles.relevant')
+
+    def _attach(self, news, article):
+        if not article:
+            return
+        news['summary'] = article['lead']
+        news['keywords'] = self.matched_keywords(
+            '\n'.join([news['title'], article['lead'], article['text']])
+        )
+
+    def extract_entries(self, key, html, base_url=None):
+        """عنوان، آدرس یکتا و زمان انتشار همه ظرف‌های خبری یک صفحه"""
+        with span('scrape.parse'):
+            return extract_page(html, self._selectors[key], base_url or self.sources[key],
+                                self.parser, self._strainers.get(key))
+
+    def select_news(self, key, entries, found=None):
+        """خبرهای مرتبط و جدید از میان ظرف‌ها؛ آن‌هایی که عنوانشان کلیدواژه ندارد نامزد بررسی متن می‌شوند
+
+        found تعداد ظرف‌های کل صفحه است وقتی entries فقط بخشی از آن‌هاست (خبرهای تازه‌تر از نشانگر).
+        """
+        source = self.source_configs[key]
         news_list = []
-        try:
-            response = requests.get(self.sources['farsnews'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = soup.find_all('div', class_='news-item')[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find('h3') or article.find('h2')
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['farsnews'] + url
-                    
-                    if self.is_relevant(title) and url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'فارس'
-                        })
-                        self.archived_urls.add(url)
-        except Exception as e:
-            print(f"خطا در اسکرپ فارس: {e}")
-        
+        seen = set()
+        relevant = 0
+        stale = 0
+        oldest = persian_time.now().timestamp() - config.MAX_NEWS_AGE_HOURS * 3600
+        with span('scrape.filter'):
+            for entry in entries:
+                title, url = entry['title'], entry['url']
+                title_relevant = not source.get('filter', True) or self.is_relevant(title)
+                if not title_relevant and not self.fetch_bodies:
+                    continue
+                relevant += title_relevant
+                # خبر قدیمی (مثلاً در ستون «پربازدیدها») ارسال نمی‌شود
+                if entry.get('published') and timestamp(entry['published']) < oldest:
+                    stale += 1
+                    continue
+                # تکراری بین منابع در claim حذف می‌شود؛ اینجا فقط تکراری همین صفحه
+                if url not in seen and not self.is_archived(url):
+                    seen.add(url)
+                    news = {
+                        'title': title,
+                        'url': url,
+                        'source': source['name'],
+                        'keywords': self.matched_keywords(title)
+                    }
+                    if entry.get('published'):
+                        news['published'] = entry['published']
+                    if title_relevant:
+                        news_list.append(news)
+                    else:
+                        # با متن خبر تصمیم گرفته می‌شود
+                        self._candidates.setdefault(key, []).append(news)
+        found = len(entries) if found is None else found
+        self.health.record_yield(key, found, relevant)
+        count('items.found', found)
+        count('items.relevant', relevant)
+        count('items.stale', stale)
         return news_list
 
-    def scrape_mehrnews(self):
-        news_list = []
+    def scrape_source(self, key):
+        """استخراج خبرهای یک منبع بر اساس انتخابگرهای تنظیمات"""
         try:
-            response = requests.get(self.sources['mehrnews'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = soup.find_all('div', class_='item')[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find('h3') or article.find('h2')
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['mehrnews'] + url
-                    
-                    if self.is_relevant(title) and url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'مهر'
-                        })
-                        self.archived_urls.add(url)
+            html = self.fetch(key)
+            if html is None:
+                return []
+            return self.select_news(key, self.extract_entries(key, html))
         except Exception as e:
-            print(f"خطا در اسکرپ مهر: {e}")
-        
-        return news_list
+            print(f"خطا در اسکرپ {self.source_configs[key]['name']}: {e}")
+            count('errors.scrape')
+            return []
 
-    def scrape_tasnimnews(self):
-        news_list = []
+    def poll_source(self, key):
+        """خبرهای تازه‌تر از نشانگر منبع
+
+        اگر همه ظرف‌های صفحه از نشانگر تازه‌تر باشند ممکن است خبرهایی بین دو
+        بررسی از صفحه اول بیرون رفته باشند؛ در این حالت صفحه‌های بعد (page_url
+        منبع) تا رسیدن به نشانگر خوانده می‌شوند.
+        """
+        source = self.source_configs[key]
+        use_ids = bool(source.get('article_path'))
         try:
-            response = requests.get(self.sources['tasnimnews'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = soup.find_all('div', class_='list-item')[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find('h3') or article.find('h2')
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['tasnimnews'] + url
-                    
-                    if self.is_relevant(title) and url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'تسنیم'
-                        })
-                        self.archived_urls.add(url)
+            html = self.fetch(key)
+            if html is None:
+                return []
+            entries = self.extract_entries(key, html)
+            fresh = [e for e in entries if self.watermarks.is_newer(key, e, use_ids)]
+            seen = list(entries)
+            page = 1
+            page_entries, page_fresh = entries, fresh
+            while (source.get('page_url') and self.watermarks.get(key) and page_entries
+                   and len(page_fresh) == len(page_entries) and page < config.POLL_MAX_PAGES):
+                page += 1
+                page_url = source['page_url'].format(page=page)
+                content = self.fetcher.get(page_url, self.health.timeout(key), conditional=False)
+                count('poll.pages')
+                page_entries = self.extract_entries(key, content, page_url)
+                page_fresh = [e for e in page_entries if self.watermarks.is_newer(key, e, use_ids)]
+                seen.extend(page_entries)
+                fresh.extend(page_fresh)
+            self.watermarks.advance(key, seen, use_ids)
+            count('poll.fresh', len(fresh))
+            # بررسی بی‌خبر تازه هم صفحه پر از ظرف خبری را دیده است
+            return self.select_news(key, fresh, found=len(entries))
         except Exception as e:
-            print(f"خطا در اسکرپ تسنیم: {e}")
-        
+            print(f"خطا در اسکرپ {source['name']}: {e}")
+            count('errors.scrape')
+            return []
+
+    def collect_source(self, key, poll=False):
+        """خبرهای یک منبع همراه با متن خبرها؛ در رشته‌های دریافت هم‌زمان اجرا می‌شود"""
+        news_list = self.poll_source(key) if poll else self.scrape_source(key)
+        return self.with_bodies(key, news_list)
+
+    def with_bodies(self, key, news_list):
+        if self.fetch_bodies:
+            with span('scrape.articles'):
+                self.add_article_bodies(key, news_list)
         return news_list
 
-    def scrape_igedc(self):
-        news_list = []
+    def parse_pool(self):
+        """استخر پردازه‌های پارس؛ یک بار در هر اجرا ساخته می‌شود"""
+        if self._processes is None:
+            workers = self.parse_processes if self.parse_processes > 0 else os.cpu_count()
+            # fork در کنار رشته‌های دریافت ممکن است قفل نیمه‌گرفته به ارث ببرد
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+            self._processes = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=_init_parse_worker,
+                initargs=(self.source_configs, self.parser, config.PARTIAL_PARSE)
+            )
+        return self._processes
+
+    def _parsed(self, results):
+        """ظرف‌های پارس‌شده در پردازه‌ها → خبرهای انتخاب‌شده هر منبع"""
+        for key, entries, seconds, error in results:
+            metrics.add_time('scrape.parse', seconds)
+            if error:
+                print(f"خطا در اسکرپ {self.source_configs[key]['name']}: {error}")
+                count('errors.scrape')
+                yield key, []
+            else:
+                yield key, self.select_news(key, entries)
+
+    def _ready(self, key, news_list):
+        print(f"✅ {self.source_configs[key]['name']}: {len(news_list)} خبر")
+        return key, news_list
+
+    def _iter_sources_processes(self, active):
+        """دریافت در رشته‌ها، پارس دسته‌ای در پردازه‌ها، انتخاب خبر در رشته اصلی و متن خبرها دوباره در رشته‌ها
+
+        همه کارهای در جریان (دریافت، پارس، متن خبر) در یک حلقه انتظار مشترک‌اند
+        تا هر منبع به محض آماده شدن تحویل شود.
+        """
+        deadline = time.monotonic() + config.FETCH_DEADLINE + (config.ARTICLE_DEADLINE if self.fetch_bodies else 0)
+        threads = ThreadPoolExecutor(max_workers=max(1, min(config.FETCH_MAX_WORKERS, len(active))))
+        processes = self.parse_pool()
+        pending = {threads.submit(self.fetch, key): ('fetch', [key]) for key in active}
+        chunk = []
         try:
-            response = requests.get(self.sources['igedc'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # سایت‌های شرکتی معمولاً خبرها رو توی بخش اخبار دارن
-            articles = soup.find_all(['div', 'article'], class_=['news', 'post', 'item'])[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find(['h1', 'h2', 'h3', 'h4'])
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['igedc'] + url
-                    
-                    if url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'شرکت توزیع گاز اصفهان'
-                        })
-                        self.archived_urls.add(url)
-        except Exception as e:
-            print(f"خطا در اسکرپ IGEDC: {e}")
-        
-        return news_list
+            while pending or chunk:
+                fetching = any(kind == 'fetch' for kind, _ in pending.values())
+                if chunk and (len(chunk) >= config.PARSE_CHUNK or not fetching):
+                    pending[processes.submit(_parse_chunk, chunk)] = ('parse', [key for key, _, _ in chunk])
+                    chunk = []
+                done, _ = wait(pending, timeout=max(0, deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError
+                for future in done:
+                    kind, keys = pending.pop(future)
+                    if kind == 'fetch':
+                        key = keys[0]
+                        try:
+                            html = future.result()
+                        except Exception as e:
+                            print(f"خطا در اسکرپ {self.source_configs[key]['name']}: {e}")
+                            count('errors.scrape')
+                            html = None
+                        if html is None:
+                            yield self._ready(key, [])
+                        else:
+                            chunk.append((key, html, self.sources[key]))
+                    elif kind == 'parse':
+                        for key, news_list in self._parsed(future.result()):
+                            if self.fetch_bodies and (news_list or self._candidates.get(key)):
+                                pending[threads.submit(self.with_bodies, key, news_list)] = ('bodies', [key])
+                            else:
+                                yield self._ready(key, news_list)
+                    else:
+                        yield self._ready(keys[0], future.result())
+        except TimeoutError:
+            error = TimeoutError(f"مهلت کل ({config.FETCH_DEADLINE} ثانیه) تمام شد")
+            # صفحه‌هایی که رسیده‌اند و در انتظار پارس یا متن خبرند خطای منبع حساب نمی‌شوند
+            for key in [key for _, keys in pending.values() for key in keys] + [key for key, _, _ in chunk]:
+                self.expire(key, error)
+        finally:
+            threads.shutdown(wait=False, cancel_futures=True)
 
-    def scrape_nigc(self):
-        news_list = []
+    def expire(self, key, error):
+        """منبعی که تا پایان مهلت کل تمام نشد
+
+        فقط دریافت ناتمام صفحه نخست خطای منبع است؛ منبعی که صفحه‌اش رسیده و
+        مرحله بعد (متن خبرها) کند بوده مدارشکنش را باز نمی‌کند.
+        """
+        if key in self._fetched:
+            count('errors.deadline')
+        else:
+            self.health.record_failure(key, error)
+            count('errors.fetch')
+        print(f"خطا در اسکرپ {self.source_configs[key]['name']}: {error}")
+
+    def claim(self, news_list):
+        """حذف خبرهایی که منبع دیگری در همین اجرا زودتر آورده"""
+        fresh = []
+        for news in news_list:
+            if news['url'] not in self.archived_urls:
+                self.archived_urls.add(news['url'])
+                fresh.append(news)
+        count('items.new', len(fresh))
+        return fresh
+
+    def active_sources(self):
+        """منابعی که پشت سر هم خطا داده‌اند تا پایان زمان استراحت بررسی نمی‌شوند"""
+        active = []
+        for key in self.sources:
+            if self.health.allow(key):
+                active.append(key)
+            else:
+                print(f"⏸ {self.source_configs[key]['name']}: به دلیل خطاهای پیاپی موقتاً بررسی نمی‌شود")
+        return active
+
+    def iter_sources(self, concurrent=None, poll=False):
+        """(کلید منبع، خبرهای خام) هر منبع به محض آماده شدن؛ منبع کند بقیه را معطل نمی‌کند"""
+        if concurrent is None:
+            concurrent = config.FETCH_CONCURRENT
+        active = self.active_sources()
         try:
-            response = requests.get(self.sources['nigc'], headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # شرکت ملی گاز
-            articles = soup.find_all(['div', 'article'], class_=['news', 'post', 'item'])[:20]
-            for article in articles:
-                link_tag = article.find('a', href=True)
-                title_tag = article.find(['h1', 'h2', 'h3', 'h4'])
-                
-                if link_tag and title_tag:
-                    title = title_tag.get_text(strip=True)
-                    url = link_tag['href']
-                    
-                    if not url.startswith('http'):
-                        url = self.sources['nigc'] + url
-                    
-                    if url not in self.archived_urls:
-                        news_list.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'شرکت ملی گاز ایران'
-                        })
-                        self.archived_urls.add(url)
-        except Exception as e:
-            print(f"خطا در اسکرپ NIGC: {e}")
-        
-        return news_list
+            if not concurrent:
+                for key in active:
+                    print(f"در حال اسکرپ از {self.source_configs[key]['name']}...")
+                    yield key, self.collect_source(key, poll)
+                return
+            if not active:
+                return
+            if self.parse_processes and not poll:
+                # بررسی طول روز صفحه بعد را بر اساس نتیجه پارس می‌خواند و در رشته‌ها می‌ماند
+                yield from self._iter_sources_processes(active)
+                return
+            deadline = config.FETCH_DEADLINE + (config.ARTICLE_DEADLINE if self.fetch_bodies else 0)
+            pool = ThreadPoolExecutor(max_workers=max(1, min(config.FETCH_MAX_WORKERS, len(active))))
+            futures = {pool.submit(self.collect_source, key, poll): key for key in active}
+            remaining = dict(futures)
+            try:
+                for future in as_completed(futures, timeout=deadline):
+                    key = remaining.pop(future)
+                    yield self._ready(key, future.result())
+            except TimeoutError:
+                # مهلت از زمان شروع حساب می‌شود؛ منبعی که هنگام کار مصرف‌کننده تمام شده از دست نمی‌رود
+                for future, key in remaining.items():
+                    if future.done():
+                        yield key, future.result()
+                        continue
+                    self.expire(key, TimeoutError(f"مهلت کل ({deadline} ثانیه) تمام شد"))
+            finally:
+                # منابع کند بعد از مهلت کل منتظر نمی‌مانند
+                pool.shutdown(wait=False, cancel_futures=True)
+        finally:
+            self.finish()
 
-    def get_all_news(self):
+    def iter_news(self, concurrent=None, poll=False):
+        """خبرهای جدید و مرتبط، منبع‌به‌منبع به ترتیب رسیدن"""
+        for key, news_list in self.iter_sources(concurrent, poll):
+            yield from self.claim(news_list)
+
+    def get_all_news(self, concurrent=None):
+        """همه خبرها به ترتیب منابع در تنظیمات، مستقل از ترتیب رسیدن"""
+        results = dict(self.iter_sources(concurrent))
         all_news = []
-        
-        print("در حال اسکرپ از ایسنا...")
-        all_news.extend(self.scrape_isna())
-        
-        print("در حال اسکرپ از ایرنا...")
-        all_news.extend(self.scrape_irna())
-        
-        print("در حال اسکرپ از فارس...")
-        all_news.extend(self.scrape_farsnews())
-        
-        print("در حال اسکرپ از مهر...")
-        all_news.extend(self.scrape_mehrnews())
-        
-        print("در حال اسکرپ از تسنیم...")
-        all_news.extend(self.scrape_tasnimnews())
-        
-        print("در حال اسکرپ از شرکت توزیع گاز اصفهان...")
-        all_news.extend(self.scrape_igedc())
-        
-        print("در حال اسکرپ از شرکت ملی گاز...")
-        all_news.extend(self.scrape_nigc())
-        
-        
-        self.save_archive()
+        for key in self.sources:
+            all_news.extend(self.claim(results.get(key, [])))
         return all_news
+
+    def finish(self):
+        """ذخیره وضعیت اجرا و چاپ گزارش؛ یک بار در پایان هر دور"""
+        self.fetcher.save_validators()
+        self.health.save()
+        self.watermarks.save()
+        if self._processes is not None:
+            self._processes.shutdown(cancel_futures=True)
+            self._processes = None
+        if self.articles:
+            self.articles.cache.save()
+        for name, value in self.fetcher.stats.items():
+            count(f'http.{name}', value)
+        print(self.fetcher.report())
+        names = {key: source['name'] for key, source in self.source_configs.items()}
+        for line in self.health.problems(names):
+            print(line)
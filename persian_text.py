@@ -0,0 +1,104 @@
+import re
+
+# یکسان‌سازی حروف عربی/فارسی، حذف نیم‌فاصله، اعراب و کشیده
+_CHAR_MAP = {
+    'ي': 'ی', 'ى': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا',
+    '\u200c': '', '\u200d': '', '\u200e': '', '\u200f': '',
+    '\u0640': '',
+    '\u00a0': ' ',
+}
+_CHAR_MAP.update({chr(c): '' for c in range(0x064B, 0x0660)})
+_CHAR_MAP['\u0670'] = ''
+_VARIANTS = re.compile('[' + ''.join(_CHAR_MAP) + ']')
+
+
+def _replace(match):
+    return _CHAR_MAP[match.group()]
+
+
+def normalize(text):
+    """نرمال‌سازی متن فارسی برای مقایسه"""
+    # بیشتر عنوان‌ها حرف ناهمسان ندارند و فقط یک جستجوی سریع هزینه دارند
+    if _VARIANTS.search(text):
+        text = _VARIANTS.sub(_replace, text)
+    return text.lower()
+
+
+def normalize_phrase(text):
+    """شکل یکسان عبارت کوتاه (موضوع کاربر)؛ نیم‌فاصله مثل فاصله حساب می‌شود
+
+    «خط‌لوله» و «خط لوله» هر دو «خط لوله» می‌شوند تا فاصله اختیاری عبارت
+    منظم هر سه شکل نوشتن را در متن خبر پیدا کند.
+    """
+    return ' '.join(normalize(text.replace('\u200c', ' ')).split())
+
+
+def phrase_key(text):
+    """کلید مقایسه عبارت بدون هیچ فاصله‌ای؛ برای تکراری‌ها و حذف همه شکل‌های یک موضوع"""
+    return normalize_phrase(text).replace(' ', '')
+
+
+def _trie_pattern(words):
+    """عبارت منظم درختی از کلیدواژه‌ها؛ پیشوندهای مشترک فقط یک بار بررسی می‌شوند"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [
+            (r'\s*' if ch == ' ' else re.escape(ch)) + build(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # کلیدواژه همین‌جا تمام می‌شود؛ ادامه اختیاری است و بلندترین تطبیق برنده است
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """تطبیق هم‌زمان همه کلیدواژه‌ها با یک عبارت منظم کامپایل‌شده"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        normalized = [' '.join(normalize(k).split()) for k in self.keywords]
+        compact = [k.replace(' ', '') for k in normalized]
+        self._index = {k: i for i, k in enumerate(compact)}
+        # کلیدواژه‌های کوتاه‌تری که داخل هر کلیدواژه هستند
+        self._implied = [
+            [j for j in range(len(compact)) if compact[j] in compact[i]]
+            for i in range(len(compact))
+        ]
+
+        # فاصله داخل کلیدواژه اختیاری است تا «خط‌لوله» هم با «خط لوله» جور شود.
+        # پیش‌نگری بدون مصرف متن از هر موقعیت یک تطبیق می‌دهد تا کلیدواژه‌های
+        # هم‌پوشان («انشعاب گاز» و «گازرسانی» در «انشعاب گازرسانی») هر دو پیدا شوند
+        self._each = re.compile('(?=(' + _trie_pattern(normalized) + '))')
+        # برای بله/خیر کافی است کلیدواژه‌هایی را بگردیم که کلیدواژه دیگری داخلشان نیست
+        minimal = [k for k, implied in zip(normalized, self._implied) if len(implied) == 1]
+        self._any = re.compile(_trie_pattern(minimal))
+
+    def search(self, text):
+        """آیا حداقل یکی از کلیدواژه‌ها در متن هست"""
+        if not text:
+            return False
+        return self._any.search(normalize(text)) is not None
+
+    def matches(self, text):
+        """فهرست کلیدواژه‌هایی که در متن پیدا شدند، به ترتیب فهرست اصلی"""
+        if not text:
+            return []
+        hits = set()
+        for match in self._each.finditer(normalize(text)):
+            hits.update(self._implied[self._index[''.join(match.group(1).split())]])
+        return [self.keywords[i] for i in sorted(hits)]
@@ -0,0 +1,180 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import jdatetime
+import pytz
+
+TEHRAN = pytz.timezone('Asia/Tehran')
+
+DAYS_FA = {
+    'Saturday': 'شنبه',
+    'Sunday': 'یکشنبه',
+    'Monday': 'دوشنبه',
+    'Tuesday': 'سه‌شنبه',
+    'Wednesday': 'چهارشنبه',
+    'Thursday': 'پنج‌شنبه',
+    'Friday': 'جمعه',
+}
+
+MONTHS_FA = {
+    'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3, 'تیر': 4, 'مرداد': 5, 'شهریور': 6,
+    'مهر': 7, 'آبان': 8, 'آذر': 9, 'دی': 10, 'بهمن': 11, 'اسفند': 12,
+}
+
+# ارقام فارسی و عربی به لاتین
+_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+_UNITS = {'ثانیه': 1, 'دقیقه': 60, 'ساعت': 3600, 'روز': 86400, 'هفته': 7 * 86400, 'ماه': 30 * 86400}
+_AGO = re.compile(r'(\d+)\s*(' + '|'.join(_UNITS) + r')\s*(?:پیش|قبل)')
+_NOW_WORDS = ('لحظاتی پیش', 'لحظاتی قبل', 'هم اکنون', 'همین الان', 'دقایقی پیش')
+_NUMERIC_DATE = re.compile(r'(\d{4})\s*[/\-.]\s*(\d{1,2})\s*[/\-.]\s*(\d{1,2})')
+_MONTH_DATE = re.compile(r'(\d{1,2})\s*(' + '|'.join(MONTHS_FA) + r')\s*(\d{4})')
+_TIME = re.compile(r'(\d{1,2}):(\d{2})')
+
+_snapshot = None
+
+
+def now():
+    """زمان این اجرا به وقت تهران؛ یک بار گرفته می‌شود تا همه سرتیترها و محاسبه‌ها یکسان باشند"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = datetime.now(TEHRAN)
+    return _snapshot
+
+
+def reset():
+    """گرفتن زمان تازه؛ برای اجراهای طولانی (حالت سرویس)"""
+    global _snapshot
+    _snapshot = None
+
+
+@lru_cache(maxsize=8)
+def _headers(day):
+    gregorian = datetime.strptime(day, '%Y-%m-%d')
+    jalali = jdatetime.date.fromgregorian(date=gregorian.date())
+    return (
+        jalali.strftime('%Y/%m/%d'),
+        gregorian.strftime('%Y/%m/%d'),
+        DAYS_FA[gregorian.strftime('%A')],
+    )
+
+
+def today():
+    """(تاریخ شمسی، تاریخ میلادی، نام روز) امروز به وقت تهران"""
+    return _headers(now().strftime('%Y-%m-%d'))
+
+
+def date_header():
+    """سرتیتر تاریخ خبرنامه"""
+    jalali_date, gregorian_date, _ = today()
+    return (
+        f"🗓 *تاریخ امروز*\n"
+        f"📅 شمسی: {jalali_date}\n"
+        f"📅 میلادی: {gregorian_date}\n\n"
+    )
+
+
+def greeting_message():
+    """پیام صبح‌بخیر با تاریخ"""
+    jalali_date, gregorian_date, day_name = today()
+    return (
+        f"🌅 *صبح به‌خیر!*\n\n"
+        f"📅 امروز {day_name}:\n"
+        f"🗓 تاریخ شمسی: {jalali_date}\n"
+        f"🗓 تاریخ میلادی: {gregorian_date}\n\n"
+        f"☕️ روز خوبی داشته باشید!"
+    )
+
+
+def _time_of_day(text):
+    """(ساعت، دقیقه) یا None اگر متن ساعت ندارد"""
+    match = _TIME.search(text)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _to_gregorian(year, month, day):
+    # سال‌های زیر 1700 شمسی‌اند
+    if year < 1700:
+        return jdatetime.date(year, month, day).togregorian()
+    return datetime(year, month, day).date()
+
+
+@lru_cache(maxsize=4096)
+def _parse(text):
+    """('at', زمان یونیکس، ساعت دارد) برای تاریخ کامل، ('ago', ثانیه) یا ('day', چند روز پیش،
+    ساعت، دقیقه) برای تاریخ نسبی، یا None
+
+    متن تاریخ صفحه‌های یک منبع معمولاً تکراری است؛ نتیجه نگه داشته می‌شود.
+    """
+    text = ' '.join(text.translate(_DIGITS).replace('\u200c', ' ').split())
+    if not text:
+        return None
+    try:
+        value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        if value.year < 1700:
+            # تاریخ شمسی با قالب ISO (۱۴۰۵-۰۷-۲۶)
+            date = _to_gregorian(value.year, value.month, value.day)
+            value = value.replace(year=date.year, month=date.month, day=date.day)
+        if value.tzinfo is None:
+            value = TEHRAN.localize(value)
+        return ('at', value.timestamp(), _TIME.search(text) is not None)
+    except ValueError:
+        pass
+
+    match = _AGO.search(text)
+    if match:
+        return ('ago', int(match.group(1)) * _UNITS[match.group(2)])
+    if any(word in text for word in _NOW_WORDS):
+        return ('ago', 0)
+    for word, days in (('امروز', 0), ('دیروز', 1)):
+        if word in text:
+            match = _TIME.search(text)
+            if match:
+                return ('day', days, int(match.group(1)), int(match.group(2)))
+            return ('ago', days * 86400)
+
+    match = _NUMERIC_DATE.search(text)
+    if match:
+        year, month, day = map(int, match.groups())
+    else:
+        match = _MONTH_DATE.search(text)
+        if not match:
+            return None
+        day, month, year = int(match.group(1)), MONTHS_FA[match.group(2)], int(match.group(3))
+    try:
+        date = _to_gregorian(year, month, day)
+    except ValueError:
+        return None
+    time_of_day = _time_of_day(text[match.end():])
+    hour, minute = time_of_day or (0, 0)
+    value = TEHRAN.localize(datetime(date.year, date.month, date.day, hour, minute))
+    return ('at', value.timestamp(), time_of_day is not None)
+
+
+def parse_date(text, reference=None):
+    """زمان انتشار از متن تاریخ صفحه (ISO، شمسی با ارقام فارسی یا نام ماه، «۲ ساعت پیش»)
+
+    خروجی (datetime به وقت تهران، دقیق) یا None؛ دقیق False یعنی تاریخ نسبی یا بدون
+    ساعت بوده است (همه خبرهای آن روز نیمه‌شب را نشان می‌دهند و برای نشانگر بررسی کافی نیستند).
+    """
+    if not text:
+        return None
+    parsed = _parse(text)
+    if parsed is None:
+        return None
+    reference = reference or now()
+    if parsed[0] == 'ago':
+        return reference - timedelta(seconds=parsed[1]), False
+    if parsed[0] == 'day':
+        _, days, hour, minute = parsed
+        return reference.replace(hour=hour, minute=minute, second=0, microsecond=0) - timedelta(days=days), False
+    return datetime.fromtimestamp(parsed[1], TEHRAN), parsed[2]
+
+
+@lru_cache(maxsize=4096)
+def timestamp(iso):
+    """زمان یونیکس رشته ISO ذخیره‌شده در خبر"""
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except (TypeError, ValueError):
+        return None
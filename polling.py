@@ -0,0 +1,109 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import config
+from news_archive import url_hash
+from state_files import append_lines, read_json, read_lines, write_json
+
+# شناسه عددی انتهای مسیر خبر (بعد از کوتاه شدن با article_path)
+_TRAILING_ID = re.compile(r'(\d+)/?$')
+
+
+def entry_id(url):
+    """شناسه عددی خبر از آدرس یکتای آن؛ برای منابع بدون شناسه None"""
+    match = _TRAILING_ID.search(urlsplit(url).path)
+    return int(match.group(1)) if match else None
+
+
+class Watermarks:
+    """آخرین خبر دیده‌شده هر منبع در بررسی‌های پیاپی
+
+    برای هر منبع بزرگ‌ترین شناسه خبر، تازه‌ترین زمان انتشار دقیق (تاریخ
+    نسبی مثل «۲ ساعت پیش» در هر بررسی جابه‌جا می‌شود و تاریخ بدون ساعت همه
+    خبرهای یک روز را هم‌زمان نشان می‌دهد) و هش آدرس خبرهای آخرین بررسی نگه داشته می‌شود. خبری تازه
+    است که شناسه یا زمان انتشارش از نشانگر بیشتر باشد؛ در نبود هر دو، آدرسش
+    در بررسی قبل دیده نشده باشد.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.POLL_STATE_FILE
+        self.marks = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.marks = {}
+        try:
+            self.marks = read_json(self.path, {})
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن {self.path}: {e}")
+
+    def get(self, key):
+        return self.marks.get(key)
+
+    def is_newer(self, key, entry, use_ids=True):
+        mark = self.marks.get(key)
+        if not mark:
+            return True
+        item_id = entry_id(entry['url']) if use_ids else None
+        if item_id is not None and mark.get('id') is not None:
+            return item_id > mark['id']
+        if entry.get('published') and entry.get('exact', True) and mark.get('published'):
+            return entry['published'] > mark['published']
+        return url_hash(entry['url']) not in mark.get('urls', [])
+
+    def advance(self, key, entries, use_ids=True):
+        """جابه‌جایی نشانگر به تازه‌ترین خبرهای دیده‌شده"""
+        if not entries:
+            return
+        with self._lock:
+            mark = self.marks.get(key) or {'id': None, 'published': None, 'urls': []}
+            ids = [entry_id(e['url']) for e in entries] if use_ids else []
+            ids = [i for i in ids if i is not None]
+            if ids:
+                mark['id'] = max(ids + ([mark['id']] if mark['id'] is not None else []))
+            dates = [e['published'] for e in entries if e.get('published') and e.get('exact', True)]
+            if dates:
+                mark['published'] = max(dates + ([mark['published']] if mark['published'] else []))
+            urls = [url_hash(e['url']) for e in entries]
+            mark['urls'] = (urls + [h for h in mark['urls'] if h not in urls])[:config.POLL_SEEN_URLS]
+            self.marks[key] = mark
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            write_json(self.path, self.marks)
+            self.dirty = False
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {self.path}: {e}")
+
+
+class NewsBuffer:
+    """خبرهای پیداشده در بررسی‌های طول روز تا ارسال در خبرنامه روزانه؛ فایل JSONL فقط‌افزودنی"""
+
+    def __init__(self, path=None):
+        self.path = path or config.NEWS_BUFFER_FILE
+
+    def load(self):
+        return read_lines(self.path)
+
+    def add_many(self, news_list):
+        if not news_list:
+            return
+        try:
+            now = int(time.time())
+            append_lines(self.path, [dict(news, buffered=now) for news in news_list])
+            print(f"📥 {len(news_list)} خبر به صف خبرنامه اضافه شد")
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {self.path}: {e}")
+
+    def clear(self):
+        """خالی کردن صف بعد از ارسال خبرنامه"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
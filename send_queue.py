@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import config
+from state_files import dumps, read_lines, write_lines
+
+# وضعیت‌هایی که کار گیرنده را تمام می‌کنند؛ rejected خطای غیرگذرای API است (مثلاً 400)
+FINAL = ('sent', 'blocked', 'rejected')
+
+
+class SendQueue:
+    """صف ماندگار ارسال؛ هر خبرنامه یا هشدار با پیام‌های ساخته‌شده و گیرنده‌هایش
+
+    فایل JSONL فقط‌افزودنی است: یک خط برای هر دسته (پیام‌های هر گروه گیرنده)
+    و یک خط برای پیشرفت هر گیرنده (بخش‌های ارسال‌شده، وضعیت). اگر اجرا وسط
+    ارسال قطع شود، اجرای بعد همان پیام‌ها را بدون اسکرپ و ساخت دوباره فقط
+    برای گیرنده‌های باقی‌مانده و از بخش ارسال‌نشده می‌فرستد. گیرنده‌ای که با
+    خطای گذرا ناموفق مانده تا SEND_QUEUE_MAX_RUNS اجرا دوباره امتحان می‌شود.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.SEND_QUEUE_FILE
+        self.batches = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self.load()
+
+    def load(self):
+        self.batches = {}
+        for record in read_lines(self.path):
+            self._apply(record)
+
+    def _apply(self, record):
+        if record['op'] == 'batch':
+            record.setdefault('state', {})
+            self.batches[record['id']] = record
+            return
+        batch = self.batches.get(record['batch'])
+        if batch is None:
+            return
+        state = batch['state'].setdefault(record['chat_id'], {'parts_sent': 0, 'status': None, 'runs': 0})
+        if record['op'] == 'state':
+            # خط فشرده‌شده بعد از compact
+            state.update(parts_sent=record['parts_sent'], status=record['status'], runs=record['runs'])
+            return
+        state['parts_sent'] = record['parts_sent']
+        if record['op'] == 'result':
+            state['status'] = record['status']
+            if record['status'] not in FINAL:
+                state['runs'] += 1
+
+    def _append(self, record):
+        line = dumps(record) + '\n'
+        with self._lock:
+            self._apply(record)
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            # هر خط بلافاصله به سیستم‌عامل سپرده می‌شود تا با قطع پردازه گم نشود
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def enqueue(self, groups, kind='digest'):
+        """ثبت پیام‌های ساخته‌شده هر گروه (گیرنده‌ها، پیام‌ها)؛ خروجی شناسه دسته"""
+        groups = [{'chat_ids': list(chat_ids), 'messages': list(messages)}
+                  for chat_ids, messages in groups if chat_ids]
+        digest = hashlib.sha1(json.dumps(groups, ensure_ascii=False).encode('utf-8')).hexdigest()[:8]
+        batch_id = f"{int(time.time())}-{digest}"
+        self._append({'op': 'batch', 'id': batch_id, 'kind': kind,
+                      'created': int(time.time()), 'groups': groups})
+        return batch_id
+
+    def jobs(self, batch_ids=None, active=None):
+        """کارهای باقی‌مانده: (شناسه دسته، گیرنده، پیام‌ها، اولین بخش ارسال‌نشده)
+
+        active: اگر داده شود فقط کاربرانی که هنوز فعال‌اند.
+        """
+        cutoff = time.time() - config.SEND_QUEUE_MAX_AGE_HOURS * 3600
+        jobs = []
+        for batch_id, batch in self.batches.items():
+            if batch_ids is not None and batch_id not in batch_ids:
+                continue
+            if batch_ids is None and batch['created'] < cutoff:
+                continue
+            for group in batch['groups']:
+                for chat_id in group['chat_ids']:
+                    state = batch['state'].get(chat_id, {})
+                    if state.get('status') in FINAL or state.get('runs', 0) >= config.SEND_QUEUE_MAX_RUNS:
+                        continue
+                    if active is not None and chat_id not in active:
+                        continue
+                    jobs.append((batch_id, chat_id, group['messages'], state.get('parts_sent', 0)))
+        return jobs
+
+    def deliver(self, broadcaster, jobs):
+        """ارسال کارها با ثبت پیشرفت هر بخش و نتیجه هر گیرنده؛ خروجی گزارش گیرنده‌ها"""
+        def progress(index, parts_sent):
+            batch_id, chat_id = jobs[index][:2]
+            self._append({'op': 'progress', 'batch': batch_id, 'chat_id': chat_id,
+                          'parts_sent': parts_sent})
+
+        def done(index, entry):
+            batch_id, chat_id = jobs[index][:2]
+            self._append({'op': 'result', 'batch': batch_id, 'chat_id': chat_id,
+                          'parts_sent': entry['parts_sent'], 'status': entry['status']})
+
+        try:
+            return broadcaster.run_jobs([job[1:] for job in jobs], progress, done)
+        finally:
+            self.close()
+
+    def compact(self):
+        """بازنویسی فقط دسته‌های ناتمام؛ صف خالی حذف می‌شود"""
+        cutoff = time.time() - config.SEND_QUEUE_MAX_AGE_HOURS * 3600
+        with self._lock:
+            keep = {batch_id: batch for batch_id, batch in self.batches.items()
+                    if batch['created'] >= cutoff and self.jobs([batch_id])}
+            self.batches = keep
+            try:
+                if not keep:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                    return
+                records = []
+                for batch_id, batch in keep.items():
+                    records.append({k: v for k, v in batch.items() if k != 'state'})
+                    records.extend({'op': 'state', 'batch': batch_id, 'chat_id': chat_id, **state}
+                                   for chat_id, state in batch['state'].items())
+                write_lines(self.path, records)
+            except Exception as e:
+                print(f"❌ خطا در ذخیره {self.path}: {e}")
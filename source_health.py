@@ -0,0 +1,121 @@
+import math
+import threading
+import time
+
+import requests
+
+import config
+from state_files import read_json, write_json
+
+
+def percentile(values, q):
+    """صدک q (بین 0 و 1) با روش نزدیک‌ترین رتبه"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class SourceHealth:
+    """سلامت منابع خبری در اجراهای پیاپی: تأخیر، کد وضعیت، بازده و خطاهای پشت سر هم
+
+    منبعی که HEALTH_FAILURE_THRESHOLD بار پشت سر هم خطا بدهد تا پایان زمان
+    استراحت بررسی نمی‌شود (مدارشکن)؛ بعد از آن یک بار امتحان می‌شود و با خطای
+    دوباره زمان استراحت دو برابر می‌شود. مهلت دریافت هر منبع از صدک ۹۵ تأخیرهای
+    اخیر آن به دست می‌آید.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.SOURCE_HEALTH_FILE
+        self.sources = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.sources = {}
+        try:
+            self.sources = read_json(self.path, {})
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن {self.path}: {e}")
+
+    def save(self):
+        """ذخیره برای اجرای بعدی؛ فقط در صورت تغییر"""
+        try:
+            write_json(self.path, self.sources)
+        except Exception as e:
+            print(f"❌ خطا در ذخیره {self.path}: {e}")
+
+    def _entry(self, key):
+        return self.sources.setdefault(key, {
+            'latencies': [],
+            'status': None,
+            'error': None,
+            'consecutive_failures': 0,
+            'open_until': 0,
+            'found': None,
+            'relevant': None,
+            'last_success': None,
+        })
+
+    def allow(self, key, now=None):
+        """آیا منبع در این اجرا بررسی شود (مدارشکن بسته یا زمان استراحت تمام شده)"""
+        entry = self.sources.get(key)
+        if not entry:
+            return True
+        return (now or time.time()) >= entry.get('open_until', 0)
+
+    def timeout(self, key):
+        """مهلت دریافت منبع بر اساس صدک ۹۵ تأخیر دریافت‌های کامل اخیر"""
+        latencies = self.sources.get(key, {}).get('latencies') or []
+        if len(latencies) < config.HEALTH_MIN_SAMPLES:
+            return config.FETCH_TIMEOUT
+        adaptive = percentile(latencies, 0.95) * config.HEALTH_TIMEOUT_FACTOR
+        return max(config.FETCH_MIN_TIMEOUT, min(config.FETCH_TIMEOUT, adaptive))
+
+    def record_success(self, key, latency, status=200):
+        with self._lock:
+            entry = self._entry(key)
+            # پاسخ 304 بدون بدنه بسیار سریع‌تر است و مهلت دریافت کامل را کم می‌کرد
+            if status == 200:
+                entry['latencies'] = (entry['latencies'] + [round(latency, 3)])[-config.HEALTH_WINDOW:]
+            entry['status'] = status
+            entry['error'] = None
+            entry['consecutive_failures'] = 0
+            entry['open_until'] = 0
+            entry['last_success'] = int(time.time())
+
+    def record_failure(self, key, error):
+        with self._lock:
+            entry = self._entry(key)
+            status = None
+            if isinstance(error, requests.HTTPError) and error.response is not None:
+                status = error.response.status_code
+            entry['status'] = status
+            entry['error'] = f"{type(error).__name__}: {error}"[:200]
+            entry['consecutive_failures'] += 1
+            excess = entry['consecutive_failures'] - config.HEALTH_FAILURE_THRESHOLD
+            if excess >= 0:
+                cooldown = min(config.HEALTH_COOLDOWN * 2 ** excess, config.HEALTH_MAX_COOLDOWN)
+                entry['open_until'] = int(time.time() + cooldown)
+
+    def record_yield(self, key, found, relevant):
+        """تعداد ظرف‌های خبری پیداشده و خبرهای مرتبط آخرین اجرا"""
+        with self._lock:
+            entry = self._entry(key)
+            entry['found'] = found
+            entry['relevant'] = relevant
+
+    def problems(self, names=None):
+        """خلاصه منابع ناسالم برای چاپ در پایان اجرا"""
+        lines = []
+        for key, entry in sorted(self.sources.items()):
+            if names is not None and key not in names:
+                continue
+            name = names.get(key, key) if names else key
+            if entry.get('consecutive_failures'):
+                line = f"🩺 {name}: {entry['consecutive_failures']} خطای پشت سر هم ({entry['error']})"
+                if not self.allow(key):
+                    line += " - تا اجرای بعد از استراحت بررسی نمی‌شود"
+                lines.append(line)
+            elif entry.get('found') == 0:
+                # صفحه دریافت شده ولی هیچ ظرف خبری پیدا نشده؛ احتمالاً قالب سایت عوض شده
+                lines.append(f"🩺 {name}: هیچ خبری در صفحه پیدا نشد؛ انتخابگرها را بررسی کنید")
+        return lines
@@ -0,0 +1,95 @@
+"""فایل‌های وضعیتی که بعد از هر اجرا در مخزن commit می‌شوند
+
+هر رکورد در یک خط فشرده و به ترتیب ثابت نوشته می‌شود تا diff گیت فقط
+خطوط تغییرکرده را نشان دهد. فایل فقط وقتی محتوایش عوض شده بازنویسی می‌شود
+(فایل موقت و جایگزینی). پسوند .gz فایل را فشرده می‌کند؛ فایل فشرده کوچک‌تر
+است ولی گیت نمی‌تواند آن را خط‌به‌خط diff کند.
+"""
+import gzip
+import json
+import os
+
+
+def dumps(record):
+    """یک رکورد در یک خط با کلیدهای مرتب"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def _read_text(path):
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write_text(path, text):
+    """نوشتن فقط در صورت تغییر؛ خروجی True اگر فایل نوشته شد"""
+    data = text.encode('utf-8')
+    if path.endswith('.gz'):
+        # mtime ثابت تا محتوای یکسان بایت‌های یکسان بدهد
+        data = gzip.compress(data, mtime=0)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_lines(path):
+    """رکوردهای فایل JSONL؛ خط ناقص از اجرای قطع‌شده کنار گذاشته می‌شود"""
+    if not os.path.exists(path):
+        return []
+    lines = [line for line in _read_text(path).splitlines() if line.strip()]
+    try:
+        # مسیر سریع: یک بار پارس کل فایل به جای پارس تک‌تک خطوط
+        return json.loads('[' + ','.join(lines) + ']')
+    except ValueError:
+        pass
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def write_lines(path, records):
+    """بازنویسی کامل فایل JSONL به ترتیب داده‌شده؛ بدون تغییر چیزی نوشته نمی‌شود"""
+    return _write_text(path, ''.join(dumps(record) + '\n' for record in records))
+
+
+def append_lines(path, records):
+    """افزودن رکوردها به انتهای فایل JSONL"""
+    text = ''.join(dumps(record) + '\n' for record in records)
+    if path.endswith('.gz'):
+        # هر افزودن یک بخش gzip جدا است که هنگام خواندن پشت هم باز می‌شود
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+
+def read_json(path, default=None):
+    """محتوای فایل JSON یا default اگر فایل نباشد"""
+    if not os.path.exists(path):
+        return default
+    return json.loads(_read_text(path))
+
+
+def write_json(path, data, sort_keys=True):
+    """دیکشنری با یک کلید در هر خط؛ همچنان JSON معتبر است
+
+    sort_keys=False ترتیب درج را نگه می‌دارد (مثلاً ترتیب عضویت کاربران).
+    خروجی True اگر فایل نوشته شد.
+    """
+    items = sorted(data.items()) if sort_keys else data.items()
+    lines = [json.dumps(str(key), ensure_ascii=False) + ':' + dumps(value) for key, value in items]
+    text = '{\n' + ',\n'.join(lines) + '\n}\n' if lines else '{}\n'
+    return _write_text(path, text)
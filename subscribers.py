@@ -0,0 +1,159 @@
+import time
+
+import config
+from persian_text import phrase_key
+from state_files import read_json, write_json
+
+
+class SubscriberStore:
+    """کاربران ثبت‌نام‌شده؛ دیکشنری chat_id به اطلاعات کاربر در users.json
+
+    هر کاربر: joined (زمان عضویت)، status (active یا blocked) و topics
+    (موضوع‌های دلخواه؛ خالی یعنی همه خبرها). زمان آخرین ارسال موفق هر کاربر که
+    هر روز عوض می‌شود در فایل جدای DELIVERY_STATE_FILE می‌ماند (کش اجراها، نه
+    مخزن). تغییرات در حافظه جمع می‌شوند و با flush یک بار (فایل موقت و
+    جایگزینی) نوشته می‌شوند.
+    """
+
+    def __init__(self, path=None, delivery_path=None):
+        self.path = path or config.USERS_FILE
+        self.delivery_path = delivery_path or config.DELIVERY_STATE_FILE
+        self.users = {}
+        self.deliveries = {}
+        self.dirty = False
+        self.deliveries_dirty = False
+        self.load()
+
+    def __contains__(self, chat_id):
+        return str(chat_id) in self.users
+
+    def __len__(self):
+        return len(self.users)
+
+    def load(self):
+        """بارگذاری کاربران؛ قالب قدیمی (لیست chat_id) خودکار تبدیل می‌شود"""
+        self.users = {}
+        self.deliveries = {}
+        self.dirty = False
+        self.deliveries_dirty = False
+        try:
+            self.deliveries = read_json(self.delivery_path, {})
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن {self.delivery_path}: {e}")
+        try:
+            data = read_json(self.path, {})
+            if isinstance(data, list):
+                now = int(time.time())
+                self.users = {str(chat_id): {'joined': now, 'status': 'active'}
+                              for chat_id in data}
+                self.dirty = True
+            else:
+                self.users = {str(chat_id): info for chat_id, info in data.items()}
+                for chat_id, info in self.users.items():
+                    # زمان آخرین ارسال در قالب قبلی هر روز همه خطوط فایل را عوض می‌کرد
+                    if 'last_delivery' in info:
+                        ts = info.pop('last_delivery')
+                        if ts and chat_id not in self.deliveries:
+                            self.deliveries[chat_id] = ts
+                            self.deliveries_dirty = True
+                        self.dirty = True
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن کاربران: {e}")
+
+    def add(self, chat_id):
+        """ثبت کاربر (یا فعال‌سازی دوباره)؛ خروجی True اگر کاربر جدید باشد"""
+        chat_id = str(chat_id)
+        info = self.users.get(chat_id)
+        if info is None:
+            self.users[chat_id] = {'joined': int(time.time()), 'status': 'active'}
+            self.dirty = True
+            return True
+        if info.get('status') != 'active':
+            info['status'] = 'active'
+            self.dirty = True
+        return False
+
+    def mark_blocked(self, chat_id):
+        info = self.users.get(str(chat_id))
+        if info is not None and info.get('status') != 'blocked':
+            info['status'] = 'blocked'
+            self.dirty = True
+
+    def mark_delivered(self, chat_id, ts=None):
+        chat_id = str(chat_id)
+        if chat_id in self.users:
+            self.deliveries[chat_id] = int(ts or time.time())
+            self.deliveries_dirty = True
+
+    def last_delivery(self, chat_id):
+        """زمان آخرین ارسال موفق یا None"""
+        return self.deliveries.get(str(chat_id))
+
+    def subscribe(self, chat_id, topic):
+        """افزودن موضوع با همان نوشتار کاربر؛ خروجی False اگر (به هر شکل نوشتنی)
+        تکراری باشد یا سقف موضوع‌ها پر شده باشد"""
+        info = self.users.get(str(chat_id))
+        if info is None:
+            return False
+        topics = info.setdefault('topics', [])
+        if self.has_topic(chat_id, topic) or len(topics) >= config.MAX_TOPICS_PER_USER:
+            return False
+        topics.append(topic)
+        self.dirty = True
+        return True
+
+    def unsubscribe(self, chat_id, topic=None):
+        """حذف یک موضوع (همه شکل‌های نوشتنش) یا (بدون topic) همه موضوع‌ها؛ خروجی True اگر چیزی حذف شد"""
+        info = self.users.get(str(chat_id))
+        if not info or not info.get('topics'):
+            return False
+        if topic is None:
+            info['topics'] = []
+        else:
+            key = phrase_key(topic)
+            kept = [t for t in info['topics'] if phrase_key(t) != key]
+            if len(kept) == len(info['topics']):
+                return False
+            info['topics'] = kept
+        self.dirty = True
+        return True
+
+    def has_topic(self, chat_id, topic):
+        """آیا موضوع (با نیم‌فاصله، فاصله یا بدون فاصله) ثبت شده است"""
+        key = phrase_key(topic)
+        return any(phrase_key(t) == key for t in self.topics(chat_id))
+
+    def topics(self, chat_id):
+        info = self.users.get(str(chat_id)) or {}
+        return list(info.get('topics', []))
+
+    def subscriptions(self):
+        """chat_id کاربران فعال -> موضوع‌هایشان، به ترتیب عضویت"""
+        return {chat_id: info.get('topics', []) for chat_id, info in self.users.items()
+                if info.get('status', 'active') == 'active'}
+
+    def active(self):
+        """chat_id کاربران فعال به ترتیب عضویت"""
+        return [chat_id for chat_id, info in self.users.items()
+                if info.get('status', 'active') == 'active']
+
+    def flush(self):
+        """نوشتن تغییرات در فایل؛ بدون تغییر چیزی نوشته نمی‌شود
+
+        هر کاربر یک خط، به ترتیب عضویت؛ کاربر جدید فقط یک خط به انتها اضافه می‌کند.
+        """
+        if self.deliveries_dirty:
+            try:
+                write_json(self.delivery_path, self.deliveries)
+                self.deliveries_dirty = False
+            except Exception as e:
+                print(f"❌ خطا در ذخیره {self.delivery_path}: {e}")
+        if not self.dirty:
+            return True
+        try:
+            write_json(self.path, self.users, sort_keys=False)
+            self.dirty = False
+            return True
+        except Exception as e:
+            print(f"❌ خطا در ذخیره کاربران: {e}")
+            return False
@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+import config
+from persian_text import KeywordMatcher, normalize_phrase
+import persian_time
+from persian_time import timestamp
+
+_source_weights = None
+
+
+def normalize_topic(text):
+    """شکل یکسان موضوع برای تطبیق با خبرها"""
+    return normalize_phrase(text)
+
+
+def source_weight(name):
+    """وزن منبع در ترتیب خبرنامه از روی نام آن"""
+    global _source_weights
+    if _source_weights is None:
+        # منبع غیرفعال هم‌نام (آدرس قبلی همان سایت) وزن منبع فعال را عوض نمی‌کند
+        _source_weights = {source['name']: source.get('weight', 1)
+                           for source in config.NEWS_SOURCES.values() if source.get('enabled', True)}
+    return _source_weights.get(name, 1)
+
+
+def news_time(news, now):
+    """زمان انتشار خبر (datetime صفحه، زمان ورود به صف یا همین حالا)"""
+    published = timestamp(news['published']) if news.get('published') else None
+    return published or news.get('buffered') or now
+
+
+def score(news, now=None):
+    """امتیاز خبر: کلیدواژه‌های متمایز، وزن منبع(ها) و تازگی"""
+    now = now or persian_time.now().timestamp()
+    weights = sorted((source_weight(name) for name in news.get('sources', [news['source']])),
+                     reverse=True)
+    # منبع دوم به بعد فقط تأیید خبرند
+    sources = weights[0] + sum(weights[1:]) / 2
+    age_hours = max(0.0, now - news_time(news, now)) / 3600
+    recency = 0.5 ** (age_hours / config.RANK_RECENCY_HALF_LIFE)
+    return (config.RANK_KEYWORD_WEIGHT * len(news.get('keywords', []))
+            + config.RANK_SOURCE_WEIGHT * sources
+            + config.RANK_RECENCY_WEIGHT * recency)
+
+
+def rank(news_list, now=None):
+    """خبرها به ترتیب امتیاز؛ هم‌امتیازها به ترتیب رسیدن"""
+    now = now or persian_time.now().timestamp()
+    scores = {id(news): score(news, now) for news in news_list}
+    return sorted(news_list, key=lambda news: -scores[id(news)])
+
+
+class TopicIndex:
+    """نمایه وارونه موضوع → کاربران مشترک
+
+    موضوع‌های هر خبر یک بار با یک عبارت منظم برای همه موضوع‌ها پیدا می‌شوند و
+    گیرنده‌ها از نمایه موضوع → گروه به دست می‌آیند، نه با بررسی تک‌تک کاربران.
+    کاربران با مجموعه موضوع یکسان یک گروه‌اند و خبرنامه هر گروه یک بار ساخته می‌شود.
+    کاربر بدون موضوع همه خبرها را می‌گیرد.
+    """
+
+    def __init__(self, subscriptions):
+        # subscriptions: chat_id -> فهرست موضوع‌ها، به ترتیب ارسال
+        self.groups = defaultdict(list)
+        for chat_id, topics in subscriptions.items():
+            self.groups[frozenset(normalize_topic(topic) for topic in topics)].append(chat_id)
+        # ترتیب گروه‌ها برای ترتیب پایدار ارسال، و گروه‌های مشترک هر موضوع
+        self._order = {topics: idx for idx, topics in enumerate(self.groups)}
+        self.topic_groups = defaultdict(list)
+        for topics in self.groups:
+            for topic in topics:
+                self.topic_groups[topic].append(topics)
+        self.matcher = KeywordMatcher(sorted(self.topic_groups)) if self.topic_groups else None
+        self._terms = {}
+
+    def terms(self, news):
+        """موضوع‌هایی که در عنوان، خلاصه یا کلیدواژه‌های خبر آمده‌اند"""
+        terms = self._terms.get(news['url'])
+        if terms is None:
+            terms = set()
+            if self.matcher:
+                text = '\n'.join([news['title'], news.get('summary') or '',
+                                  ' '.join(news.get('keywords', []))])
+                terms = set(self.matcher.matches(text))
+            self._terms[news['url']] = terms
+        return terms
+
+    def recipients(self, news):
+        """کاربرانی که این خبر را می‌گیرند، به ترتیب ارسال؛ فقط گروه‌های موضوع‌های خبر بررسی می‌شوند"""
+        groups = {topics for term in self.terms(news) for topics in self.topic_groups[term]}
+        if frozenset() in self.groups:
+            groups.add(frozenset())
+        return [chat_id for topics in sorted(groups, key=self._order.__getitem__)
+                for chat_id in self.groups[topics]]
+
+    def split(self, news_list):
+        """(موضوع‌ها، کاربران، خبرها) برای هر گروه؛ ترتیب خبرها حفظ می‌شود"""
+        by_term = defaultdict(list)
+        for idx, news in enumerate(news_list):
+            for term in self.terms(news):
+                by_term[term].append(idx)
+        for topics, chat_ids in self.groups.items():
+            if not topics:
+                yield topics, chat_ids, news_list
+                continue
+            selected = sorted(set().union(*(by_term[topic] for topic in topics)))
+            yield topics, chat_ids, [news_list[idx] for idx in selected]